@@ -1,7 +1,6 @@
 import re
 import os
 import glob
-import matplotlib.pyplot as plt
 
 def parse_log_file(filepath):
     metrics = {
@@ -95,6 +94,9 @@ def print_report(metrics):
     return std_avg_time, std_success_rate, lev_avg_time, lev_success_rate
 
 def generate_graphs(std_time, std_rate, lev_time, lev_rate):
+    # Imported here so the log parser can be used (and benchmarked) without matplotlib
+    import matplotlib.pyplot as plt
+
     methods = ['Standard', 'Levenshtein']
     times = [std_time, lev_time]
     rates = [std_rate, lev_rate]
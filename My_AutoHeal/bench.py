@@ -0,0 +1,374 @@
+"""
+Benchmark suite for the healing stack, with baseline regression gating.
+
+Levels:
+  micro  - levenshtein_distance, LocatorStore load/save at 1k/100k entries,
+           log parsing (analyze_accuracy / get_accuracy_report)
+  meso   - _heal_locator for AutoHealingDriver and LevenshteinDriver against
+           a browserless DOM (dom.StaticDriver) built from our pages
+  macro  - the full test.py / levenshtein.py scenarios on StaticDriver
+
+Usage:
+  python bench.py                          # run all levels, compare to baseline
+  python bench.py --level micro meso       # subset
+  python bench.py --save-baseline          # record current run as the baseline
+  python bench.py --threshold 0.25         # allowed slowdown before failing
+
+Exit code is 1 when any benchmark regressed past the threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from selenium.webdriver.common.by import By
+
+from driver import AutoHealingDriver, LocatorInfo, LocatorStore
+from levenshtein import LevenshteinDriver, levenshtein_distance
+from dom import StaticDriver
+import analyze_accuracy
+import get_accuracy_report
+import levenshtein as lev_scenarios
+import test as rule_scenarios
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(BASE_DIR, "benchmarks")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "latest.json")
+
+# Short enough that WebDriverWait makes a single attempt and never sleeps, so
+# healing cost is measured instead of poll intervals.
+HEAL_TIMEOUT = 1e-6
+
+
+@dataclass
+class BenchResult:
+    name: str
+    level: str
+    samples: List[float]
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        p90 = ordered[min(len(ordered) - 1, int(round(0.9 * (len(ordered) - 1))))]
+        return {
+            "level": self.level,
+            "unit": "s",
+            "runs": len(ordered),
+            "median": statistics.median(ordered),
+            "mean": statistics.fmean(ordered),
+            "min": ordered[0],
+            "p90": p90,
+            **self.extra,
+        }
+
+
+def measure(fn: Callable[[], Any], repeat: int, number: int = 1,
+            setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Per-call seconds for `repeat` samples of `number` calls each."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+# --- micro ---
+
+def _store_entries(count: int) -> Dict[str, LocatorInfo]:
+    # Single-token ids never form a locator family, so load_* keeps timing N entries
+    now = time.time()
+    return {
+        f"element_{i}": LocatorInfo(
+            by=By.ID,
+            value=f"element{i}",
+            last_success_ts=now,
+            attributes={"id": f"element{i}", "class": "btn", "tag": "button", "text": f"Item {i}"},
+        )
+        for i in range(count)
+    }
+
+
+def bench_micro(quick: bool) -> List[BenchResult]:
+    results = []
+    pairs = [
+        ("login-btn-prmary", "login-btn-primary"),
+        ("add_cart_laptop", "add_to_cart_laptop"),
+        ("update_settngs_btn", "update_settings_btn"),
+    ]
+    results.append(BenchResult("micro.levenshtein.short", "micro", measure(
+        lambda: [levenshtein_distance(a, b) for a, b in pairs], repeat=20, number=200)))
+    long_a, long_b = "section-" * 25, "sectoin-" * 25
+    results.append(BenchResult("micro.levenshtein.long", "micro", measure(
+        lambda: levenshtein_distance(long_a, long_b), repeat=10, number=5)))
+
+    tmp = tempfile.mkdtemp(prefix="autoheal-bench-")
+    try:
+        sizes = [(1_000, "1k", 10)] + ([] if quick else [(100_000, "100k", 3)])
+        for count, label, repeat in sizes:
+            path = os.path.join(tmp, f"store_{label}.json")
+            store = LocatorStore(path)
+            store._data = _store_entries(count)
+            results.append(BenchResult(f"micro.store.save_{label}", "micro",
+                                       measure(store.save, repeat=repeat)))
+            results.append(BenchResult(f"micro.store.load_{label}", "micro",
+                                       measure(lambda: LocatorStore(path), repeat=repeat)))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for log_name in ("auto_heal.log", "levenshtein.log"):
+        path = os.path.join(BASE_DIR, "logs", log_name)
+        if not os.path.exists(path):
+            continue
+        key = log_name.replace(".log", "")
+        with contextlib.redirect_stdout(io.StringIO()):
+            results.append(BenchResult(f"micro.logparse.analyze.{key}", "micro",
+                                       measure(lambda: analyze_accuracy.parse_log_file(path), repeat=10)))
+            results.append(BenchResult(f"micro.logparse.report.{key}", "micro",
+                                       measure(lambda: get_accuracy_report.calculate_accuracy(path), repeat=10)))
+    return results
+
+
+# --- meso / macro helpers ---
+
+class _FindCollector:
+    """Runs a scenario function without a browser, recording its find() calls."""
+
+    class _Dummy:
+        def click(self):
+            pass
+
+        def send_keys(self, *args):
+            pass
+
+    def __init__(self):
+        self.page = None
+        self.finds: List[Tuple[str, str, str, str]] = []
+
+    def get(self, url: str) -> None:
+        self.page = url
+
+    def find(self, name: str, by: str, value: str, timeout: Optional[int] = None):
+        self.finds.append((self.page, name, by, value))
+        return self._Dummy()
+
+
+def collect_finds(scenarios: List[Callable]) -> List[Tuple[str, str, str, str]]:
+    collector = _FindCollector()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for scenario in scenarios:
+            scenario(collector)
+    return collector.finds
+
+
+RULE_SCENARIOS = [
+    rule_scenarios.run_login_scenario,
+    rule_scenarios.run_ecommerce_scenario,
+    rule_scenarios.run_blog_scenario,
+    rule_scenarios.run_dashboard_scenario,
+    rule_scenarios.run_contact_scenario,
+]
+LEVENSHTEIN_SCENARIOS = [
+    lev_scenarios.run_login_scenario,
+    lev_scenarios.run_ecommerce_scenario,
+    lev_scenarios.run_blog_scenario,
+    lev_scenarios.run_dashboard_scenario,
+    lev_scenarios.run_contact_scenario,
+]
+
+
+def _make_driver(cls, tmp: str, seed: bool) -> AutoHealingDriver:
+    ah = cls(
+        StaticDriver(),
+        locator_store_path=os.path.join(tmp, "store.json"),
+        metrics_path=os.path.join(tmp, "metrics.json"),
+        default_timeout=HEAL_TIMEOUT,
+    )
+    ah.store.clear()
+    if seed:
+        with contextlib.redirect_stdout(io.StringIO()):
+            rule_scenarios.seed_memory(ah)
+    return ah
+
+
+def bench_meso(quick: bool) -> List[BenchResult]:
+    results = []
+    repeat = 3 if quick else 10
+    tmp = tempfile.mkdtemp(prefix="autoheal-bench-")
+    try:
+        for label, cls, scenarios, seed in [
+            ("rules", AutoHealingDriver, RULE_SCENARIOS, True),
+            ("levenshtein", LevenshteinDriver, LEVENSHTEIN_SCENARIOS, False),
+        ]:
+            ah = _make_driver(cls, tmp, seed)
+            for url, name, by, value in collect_finds(scenarios):
+                ah.driver.get(url)
+                before = sum(ah.driver.commands.values())
+                healed = ah._heal_locator(name, by, value, HEAL_TIMEOUT)
+                round_trips = sum(ah.driver.commands.values()) - before
+                samples = measure(lambda: ah._heal_locator(name, by, value, HEAL_TIMEOUT), repeat=repeat)
+                results.append(BenchResult(f"meso.heal.{label}.{name}", "meso", samples, {
+                    "healed": healed is not None,
+                    "round_trips": round_trips,
+                }))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def bench_macro(quick: bool) -> List[BenchResult]:
+    results = []
+    repeat = 1 if quick else 3
+    tmp = tempfile.mkdtemp(prefix="autoheal-bench-")
+    try:
+        for label, cls, scenarios, seed in [
+            ("rules", AutoHealingDriver, RULE_SCENARIOS, True),
+            ("levenshtein", LevenshteinDriver, LEVENSHTEIN_SCENARIOS, False),
+        ]:
+            samples = []
+            for _ in range(repeat):
+                ah = _make_driver(cls, tmp, seed)
+                failed_scenarios = 0
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for scenario in scenarios:
+                        # Scenarios are expected to fail on some pages (see test.py main);
+                        # keep going so every page is timed.
+                        try:
+                            scenario(ah)
+                        except Exception:
+                            failed_scenarios += 1
+                ah.quit()
+                samples.append(time.perf_counter() - start)
+            results.append(BenchResult(f"macro.scenarios.{label}", "macro", samples, {
+                "failed_scenarios": failed_scenarios,
+                "round_trips": sum(ah.driver.commands.values()),
+                "heals_successful": ah.metrics.heals_successful,
+                "heals_failed": ah.metrics.heals_failed,
+            }))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+LEVELS = {"micro": bench_micro, "meso": bench_meso, "macro": bench_macro}
+
+
+# --- baselines ---
+
+def run(levels: List[str], quick: bool = False) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for level in levels:
+        print(f"Running {level} benchmarks...")
+        for r in LEVELS[level](quick):
+            results[r.name] = r.stats()
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float, min_delta: float) -> List[Dict[str, Any]]:
+    """
+    A benchmark regresses when its median is more than `threshold` (relative)
+    and `min_delta` seconds (absolute) slower than the baseline median.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, cur in current["results"].items():
+        base = base_results.get(name)
+        if base is None:
+            rows.append({"name": name, "status": "new", "current": cur["median"]})
+            continue
+        ratio = cur["median"] / base["median"] if base["median"] else float("inf")
+        delta = cur["median"] - base["median"]
+        if ratio > 1 + threshold and delta > min_delta:
+            status = "REGRESSION"
+        elif ratio < 1 - threshold and -delta > min_delta:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "status": status, "current": cur["median"],
+                     "baseline": base["median"], "ratio": ratio})
+    for name in base_results:
+        if name not in current["results"]:
+            rows.append({"name": name, "status": "missing", "baseline": base_results[name]["median"]})
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    print("\n" + "=" * 78)
+    print(f"  BENCHMARK REGRESSION REPORT (threshold +{threshold:.0%})")
+    print("=" * 78)
+    print(f"  {'benchmark':<44} {'baseline':>10} {'current':>10} {'ratio':>6}  status")
+    for row in rows:
+        base = f"{row['baseline'] * 1000:.3f}ms" if "baseline" in row else "-"
+        cur = f"{row['current'] * 1000:.3f}ms" if "current" in row else "-"
+        ratio = f"{row['ratio']:.2f}" if "ratio" in row else "-"
+        print(f"  {row['name']:<44} {base:>10} {cur:>10} {ratio:>6}  {row['status']}")
+    print("=" * 78 + "\n")
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Auto-Heal benchmark suite")
+    parser.add_argument("--level", nargs="+", choices=list(LEVELS), default=list(LEVELS))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="allowed relative slowdown of the median (default 0.20)")
+    parser.add_argument("--min-delta", type=float, default=0.0005,
+                        help="ignore slowdowns smaller than this many seconds (default 0.0005)")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats, skip 100k store")
+    args = parser.parse_args(argv)
+
+    # Keep benchmark runs out of the scenario logs.
+    logging.basicConfig(handlers=[logging.NullHandler()], level=logging.INFO, force=True)
+
+    current = run(args.level, quick=args.quick)
+    write_json(args.output, current)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, current)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold, args.min_delta)
+    print_comparison(rows, args.threshold)
+    return 1 if any(r["status"] == "REGRESSION" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Cost-ordered healer cascade.
+
+CascadeDriver runs a chain of healers, cheapest first, until one heals the
+locator or the per-find budget (heal_budget seconds) runs out:
+
+  rules       ~5 ms   stored locator/attribute fallbacks, ID/Name/Class
+                      rewrites, text index, exact selector relaxations
+  structural  ~20 ms  fuzzy compound CSS/XPath healing, targeted queries
+  fuzzy       ~100 ms Levenshtein over every id/name/class on the page
+
+A healed locator that matches more than one element is held back while
+the later healers get a chance; it is used only if none of them heal.
+A healer is skipped when its expected cost no longer fits in what is left
+of the budget. The estimate starts at the declared cost and follows an
+exponentially weighted average of what the healer actually took; every
+skip moves it halfway back to the declared cost, so a healer that was
+slow once gets re-probed instead of being shut out for good. A running
+healer gets the find's deadline and stops between queries and candidates
+once it has passed. Healer probes are single-shot: the primary locator
+has already waited the full timeout in find().
+
+Stages only match; the cascade counts one heal attempt per find and writes
+one [Performance] line (Method=Cascade, Attempts = healers run).
+
+The DOM-wide scans share one candidate snapshot per find: one
+execute_script round trip returns every element's id, name and class.
+
+    ah = CascadeDriver(driver, heal_budget=1.0)
+    ah = CascadeDriver(driver, healers=[RuleHealer(), FuzzyAttributeHealer()])
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from driver import expired
+from levenshtein import ATTRIBUTES, LevenshteinDriver
+
+# [[id, name, class], ...] for every element carrying one of them
+SNAPSHOT_SCRIPT = """
+var rows = [];
+var els = document.querySelectorAll('[id],[name],[class]');
+for (var i = 0; i < els.length; i++) {
+  var el = els[i];
+  rows.push([el.getAttribute('id'), el.getAttribute('name'), el.getAttribute('class')]);
+}
+return rows;
+"""
+SNAPSHOT_ATTRIBUTES = ("id", "name", "class")
+
+# Weight of the newest observation in a healer's cost estimate
+COST_SMOOTHING = 0.3
+# Share of the gap to the declared cost a skipped healer's estimate keeps
+SKIP_DECAY = 0.5
+
+
+class Healer:
+    """
+    One stage of the cascade. cost is the expected time in seconds. heal()
+    only matches: it returns the healed locator (or None) and how many
+    candidates it tried, and leaves metrics and logging to the cascade.
+    """
+
+    name = "healer"
+    cost = 0.0
+
+    def applies(self, by: str) -> bool:
+        return True
+
+    def heal(self, ah: "CascadeDriver", name: str, by: str, value: str,
+             timeout: float, deadline: float) -> Tuple[Optional[Tuple[str, str, str]], int]:
+        raise NotImplementedError
+
+
+class RuleHealer(Healer):
+    name = "rules"
+    cost = 0.005
+
+    def heal(self, ah, name, by, value, timeout, deadline):
+        return ah._match_rules(name, by, value, timeout, deadline)
+
+
+class StructuralHealer(Healer):
+    name = "structural"
+    cost = 0.02
+
+    def applies(self, by: str) -> bool:
+        return by in (By.CSS_SELECTOR, By.XPATH)
+
+    def heal(self, ah, name, by, value, timeout, deadline):
+        return ah._match_compound(name, by, value, deadline)
+
+
+class FuzzyAttributeHealer(Healer):
+    name = "fuzzy"
+    cost = 0.1
+
+    def applies(self, by: str) -> bool:
+        return by in ATTRIBUTES
+
+    def heal(self, ah, name, by, value, timeout, deadline):
+        return ah._match_attribute(name, by, value, timeout, deadline)
+
+
+def default_healers() -> List[Healer]:
+    return [RuleHealer(), StructuralHealer(), FuzzyAttributeHealer()]
+
+
+class CascadeDriver(LevenshteinDriver):
+    """
+    AutoHealingDriver whose _heal_locator runs a cost-ordered chain of
+    healers under a per-find time budget.
+    """
+
+    def __init__(
+        self,
+        driver,
+        *args,
+        healers: Optional[List[Healer]] = None,
+        heal_budget: float = 2.0,
+        attempt_timeout: float = 1e-6,
+        **kwargs,
+    ):
+        super().__init__(driver, *args, **kwargs)
+        self.healers = sorted(healers or default_healers(), key=lambda h: h.cost)
+        self.heal_budget = heal_budget
+        self.attempt_timeout = attempt_timeout
+        # Estimated seconds per healer, once it has run: name -> estimate
+        self.observed: Dict[str, float] = {}
+        self._snapshot: Optional[Dict[str, List[str]]] = None
+
+    def expected_cost(self, healer: Healer) -> float:
+        return self.observed.get(healer.name, healer.cost)
+
+    def _heal_locator(
+        self,
+        name: str,
+        by: str,
+        value: str,
+        timeout: int,
+    ) -> Optional[Tuple[str, str, str]]:
+        start_time = time.time()
+        deadline = start_time + self.heal_budget
+        self.metrics.heals_attempted += 1
+        self._snapshot = None  # one candidate snapshot per find
+        ran = []
+        healed = None
+        ambiguous = None
+        try:
+            for healer in self.healers:
+                if not healer.applies(by):
+                    continue
+                remaining = deadline - time.time()
+                expected = self.expected_cost(healer)
+                if expected > remaining:
+                    logging.info("[%s] (Cascade) Skipping %s: expected %.3fs, %.3fs left",
+                                 name, healer.name, expected, remaining)
+                    self._skipped(healer)
+                    continue
+                healer_start = time.time()
+                try:
+                    healed, _ = healer.heal(self, name, by, value, min(self.attempt_timeout, remaining), deadline)
+                except Exception as e:
+                    logging.warning("[%s] (Cascade) %s failed: %s", name, healer.name, e)
+                    healed = None
+                self._observe(healer.name, time.time() - healer_start)
+                ran.append(healer.name)
+                if not healed:
+                    continue
+                healed = (healed[0], healed[1], f"{healed[2]} [cascade:{healer.name}]")
+                if self._matches_one(healed[0], healed[1]):
+                    break
+                # Matches several elements: keep it, but give the later stages a chance
+                logging.info("[%s] (Cascade) %s healed to an ambiguous locator %s=%s",
+                             name, healer.name, healed[0], healed[1])
+                ambiguous = ambiguous or healed
+                healed = None
+            healed = healed or ambiguous
+        finally:
+            self._snapshot = None
+
+        self._heal_done(name, "Cascade", start_time, healed, "Attempts", len(ran))
+        return healed
+
+    def _observe(self, healer: str, seconds: float) -> None:
+        previous = self.observed.get(healer)
+        self.observed[healer] = seconds if previous is None else (
+            COST_SMOOTHING * seconds + (1 - COST_SMOOTHING) * previous
+        )
+
+    def _skipped(self, healer: Healer) -> None:
+        """Pulls a skipped healer's estimate back toward its declared cost."""
+        if healer.name in self.observed:
+            estimate = self.observed[healer.name]
+            self.observed[healer.name] = healer.cost + SKIP_DECAY * (estimate - healer.cost)
+
+    def _candidates(self, attribute: str, deadline: Optional[float] = None) -> List[str]:
+        if attribute not in SNAPSHOT_ATTRIBUTES:
+            return super()._candidates(attribute, deadline)
+        if self._snapshot is None:
+            self._snapshot = self._take_snapshot()
+        if attribute not in self._snapshot:
+            values = super()._candidates(attribute, deadline)
+            if expired(deadline):
+                return values  # cut short; don't share a partial list
+            self._snapshot[attribute] = values
+        return self._snapshot[attribute]
+
+    def _take_snapshot(self) -> Dict[str, List[str]]:
+        try:
+            rows = self.driver.execute_script(SNAPSHOT_SCRIPT)
+        except WebDriverException:
+            return {}  # no JavaScript (StaticDriver): one query per attribute, cached for the find
+        return {
+            attribute: [row[i] for row in rows if row[i]]
+            for i, attribute in enumerate(SNAPSHOT_ATTRIBUTES)
+        }
@@ -0,0 +1,482 @@
+"""
+Synthetic DOM mutation corpus for scaled accuracy/latency studies.
+
+Pages of 100 to 100k elements are assembled from the body-level blocks of
+our page_*.html files. A fraction of the interactive elements (controlled
+by `severity`) then receive mutations:
+
+  typo            - 1-2 character edits to the id
+  token_rename    - one id token replaced by a synonym (btn -> button, ...)
+  id_regen        - id replaced by a generated one (el-3f9a2c)
+  class_reshuffle - classes shuffled, one dropped, utility classes added
+  subtree_move    - element moved into another block
+  wrapper         - element wrapped in a new div/span
+
+Every page comes with ground truth: for each target, the locator and
+attributes a previous release would have stored, and the element's id
+after mutation. Pages are generated and evaluated one at a time so a
+corpus never has to fit in memory.
+
+Usage:
+  python corpus.py generate --out corpus --sizes 100 1000 10000 --severity 0.2 0.5
+  python corpus.py evaluate --sizes 100 1000 10000 --severity 0.2 0.5
+  python corpus.py evaluate --from corpus --locator css
+  python -m doctest corpus.py
+"""
+
+import argparse
+import csv
+import glob
+import html
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+
+from selenium.webdriver.common.by import By
+
+from driver import AutoHealingDriver, LocatorInfo
+from levenshtein import LevenshteinDriver
+from cascade import CascadeDriver
+from dom import Node, Document, StaticDriver, VOID_TAGS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+INTERACTIVE_TAGS = {"a", "button", "input", "select", "textarea"}
+MUTATIONS = ["typo", "token_rename", "id_regen", "class_reshuffle", "subtree_move", "wrapper"]
+SYNONYMS = {
+    "btn": "button", "button": "btn", "msg": "message", "message": "msg",
+    "box": "field", "link": "anchor", "email": "mail", "name": "fullname",
+    "update": "edit", "toggle": "switch", "view": "show", "send": "submit",
+    "search": "find", "add": "put", "checkout": "pay", "comment": "reply",
+    "post": "publish", "read": "open", "save": "store", "contact": "support",
+    "settings": "prefs", "cart": "basket", "subscribe": "join", "now": "today",
+}
+UTILITY_CLASSES = ["mt-2", "px-3", "flex", "rounded", "shadow-sm", "text-left", "v2"]
+
+# Captured like AutoHealingDriver._on_success does
+CAPTURED_ATTRIBUTES = ["id", "name", "class", "type"]
+
+
+@dataclass
+class Target:
+    name: str
+    original: Dict[str, str]
+    stored: Dict[str, Any]
+    truth: Dict[str, str]
+    css: str
+    mutations: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CorpusPage:
+    page_id: str
+    size: int
+    severity: float
+    seed: int
+    html: str
+    targets: List[Target]
+
+    def manifest(self, html_file: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "page_id": self.page_id,
+            "size": self.size,
+            "severity": self.severity,
+            "seed": self.seed,
+            "html_file": html_file,
+            "targets": [asdict(t) for t in self.targets],
+        }
+
+
+# --- templates ---
+
+def load_templates(pattern: str = os.path.join(BASE_DIR, "page_*.html")) -> List[Node]:
+    """Body-level blocks of the sample pages, used as building material."""
+    blocks = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            doc = Document(f.read())
+        body = doc.by_tag.get("body")
+        if body:
+            blocks.extend(n for n in body[0].elements() if n.tag not in ("script", "style"))
+    if not blocks:
+        raise FileNotFoundError(f"No template pages matched {pattern}")
+    return blocks
+
+
+def _count(node: Node) -> int:
+    return 1 + sum(_count(c) for c in node.elements())
+
+
+def _clone(node: Node, parent: Optional[Node], suffix: str) -> Node:
+    attrs = dict(node.attrs)
+    for key in ("id", "name", "for"):
+        if attrs.get(key) and suffix:
+            attrs[key] = f"{attrs[key]}{suffix}"
+    copy = Node(node.tag, attrs, parent)
+    for child in node.children:
+        copy.children.append(child if isinstance(child, str) else _clone(child, copy, suffix))
+    return copy
+
+
+def serialize(node: Node) -> str:
+    parts: List[str] = []
+
+    def walk(n: Node) -> None:
+        attrs = "".join(
+            f' {k}' if v is None else f' {k}="{html.escape(v, quote=True)}"'
+            for k, v in n.attrs.items()
+        )
+        parts.append(f"<{n.tag}{attrs}>")
+        if n.tag in VOID_TAGS:
+            return
+        for child in n.children:
+            if isinstance(child, str):
+                parts.append(child if n.tag in ("script", "style") else html.escape(child, quote=False))
+            else:
+                walk(child)
+        parts.append(f"</{n.tag}>")
+
+    walk(node)
+    return "".join(parts)
+
+
+# --- mutations ---
+
+def _typo(value: str, rng: random.Random) -> str:
+    if len(value) < 3:
+        return value + rng.choice("xyz")
+    chars = list(value)
+    i = rng.randrange(1, len(chars) - 1)
+    op = rng.choice(["delete", "insert", "substitute", "transpose"])
+    if op == "delete":
+        del chars[i]
+    elif op == "insert":
+        chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+    elif op == "substitute":
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    else:
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def _token_rename(value: str, rng: random.Random) -> str:
+    sep = "_" if "_" in value else "-"
+    tokens = value.split(sep)
+    known = [i for i, t in enumerate(tokens) if t in SYNONYMS]
+    i = rng.choice(known) if known else rng.randrange(len(tokens))
+    tokens[i] = SYNONYMS.get(tokens[i], tokens[i] + "v2")
+    return sep.join(tokens)
+
+
+def _mutate(node: Node, kind: str, blocks: List[Node], rng: random.Random) -> None:
+    if kind == "typo":
+        node.attrs["id"] = _typo(node.attrs["id"], rng)
+    elif kind == "token_rename":
+        node.attrs["id"] = _token_rename(node.attrs["id"], rng)
+    elif kind == "id_regen":
+        node.attrs["id"] = f"el-{rng.getrandbits(24):06x}"
+    elif kind == "class_reshuffle":
+        classes = node.classes()
+        if classes:
+            classes.pop(rng.randrange(len(classes)))
+        classes.extend(rng.sample(UTILITY_CLASSES, 2))
+        rng.shuffle(classes)
+        node.attrs["class"] = " ".join(classes)
+    elif kind == "subtree_move":
+        destination = rng.choice(blocks)
+        if destination.contains(node) or node.contains(destination):
+            return
+        node.parent.children.remove(node)
+        node.parent = destination
+        destination.children.append(node)
+    elif kind == "wrapper":
+        parent = node.parent
+        wrapper = Node(rng.choice(["div", "span"]), {"class": rng.choice(UTILITY_CLASSES)}, parent)
+        parent.children[parent.children.index(node)] = wrapper
+        wrapper.children.append(node)
+        node.parent = wrapper
+
+
+def _stored_info(node: Node) -> Dict[str, Any]:
+    attributes = {a: node.attrs[a] for a in CAPTURED_ATTRIBUTES if node.attrs.get(a)}
+    attributes["tag"] = node.tag
+    if node.tag not in ("input", "select", "textarea"):
+        text = node.visible_text()
+        if text:
+            attributes["text"] = text[:50]
+    return asdict(LocatorInfo(by=By.ID, value=node.attrs["id"], last_success_ts=time.time(), attributes=attributes))
+
+
+def _css_path(node: Node) -> str:
+    """Nearest ancestor id + tag.classes of the node, the shape testers usually write."""
+    own = node.tag + "".join(f".{c}" for c in node.classes())
+    parent = node.parent
+    while parent is not None and parent.tag != "#document":
+        if parent.attrs.get("id"):
+            return f"#{parent.attrs['id']} {own}"
+        parent = parent.parent
+    return own
+
+
+def generate_page(size: int, severity: float, seed: int, templates: List[Node]) -> CorpusPage:
+    rng = random.Random(seed)
+    body = Node("body", {})
+    blocks: List[Node] = []
+    total, instance = 0, 0
+    while total < size:
+        template = rng.choice(templates)
+        block = _clone(template, body, f"_{instance}" if instance else "")
+        body.children.append(block)
+        blocks.append(block)
+        total += _count(block)
+        instance += 1
+
+    targets: List[Tuple[Node, Target]] = []
+    used_ids = set()
+    stack = list(blocks)
+    while stack:
+        node = stack.pop()
+        if node.attrs.get("id"):
+            used_ids.add(node.attrs["id"])
+        if node.tag in INTERACTIVE_TAGS and node.attrs.get("id"):
+            original = {"by": By.ID, "value": node.attrs["id"]}
+            targets.append((node, Target(
+                name=node.attrs["id"],
+                original=original,
+                stored=_stored_info(node),
+                truth=dict(original),
+                css=_css_path(node),
+            )))
+        stack.extend(node.elements())
+
+    for node, target in targets:
+        if rng.random() >= severity:
+            continue
+        kinds = rng.sample(MUTATIONS, 2 if rng.random() < severity else 1)
+        for kind in kinds:
+            _mutate(node, kind, blocks, rng)
+        # Keep ids unique so the ground truth names exactly one element
+        if node.attrs["id"] != target.original["value"]:
+            while node.attrs["id"] in used_ids:
+                node.attrs["id"] += "x"
+            used_ids.add(node.attrs["id"])
+        target.mutations = kinds
+        target.truth = {"by": By.ID, "value": node.attrs["id"]}
+
+    page_html = (
+        "<!DOCTYPE html><html><head><meta charset=\"UTF-8\">"
+        f"<title>Corpus {size} / {severity}</title></head>{serialize(body)}</html>"
+    )
+    return CorpusPage(
+        page_id=f"n{size}-s{severity:g}-{seed}",
+        size=size,
+        severity=severity,
+        seed=seed,
+        html=page_html,
+        targets=[t for _, t in targets],
+    )
+
+
+def iter_corpus(sizes: List[int], severities: List[float], pages: int = 1,
+                seed: int = 0) -> Iterator[CorpusPage]:
+    templates = load_templates()
+    for size in sizes:
+        for severity in severities:
+            for i in range(pages):
+                yield generate_page(size, severity, seed + i, templates)
+
+
+def write_corpus(out_dir: str, corpus: Iterator[CorpusPage]) -> int:
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    with open(os.path.join(out_dir, "manifest.jsonl"), "w", encoding="utf-8") as manifest:
+        for page in corpus:
+            html_file = f"{page.page_id}.html"
+            with open(os.path.join(out_dir, html_file), "w", encoding="utf-8") as f:
+                f.write(page.html)
+            manifest.write(json.dumps(page.manifest(html_file)) + "\n")
+            count += 1
+    return count
+
+
+def read_corpus(out_dir: str) -> Iterator[CorpusPage]:
+    with open(os.path.join(out_dir, "manifest.jsonl"), "r", encoding="utf-8") as manifest:
+        for line in manifest:
+            entry = json.loads(line)
+            with open(os.path.join(out_dir, entry["html_file"]), "r", encoding="utf-8") as f:
+                page_html = f.read()
+            yield CorpusPage(
+                page_id=entry["page_id"],
+                size=entry["size"],
+                severity=entry["severity"],
+                seed=entry["seed"],
+                html=page_html,
+                targets=[Target(**t) for t in entry["targets"]],
+            )
+
+
+# --- evaluation ---
+
+HEALERS = {"rules": AutoHealingDriver, "levenshtein": LevenshteinDriver, "cascade": CascadeDriver}
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """
+    Nearest-rank q-th percentile of an ascending list (0.0 when empty), so
+    p95 is never below the median even for a handful of samples.
+
+    >>> percentile([0.173, 0.259], 95)
+    0.259
+    >>> percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50)
+    3.0
+    """
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class _Stats:
+    def __init__(self):
+        self.lookups = 0
+        self.intact = 0
+        self.correct = 0
+        self.wrong = 0
+        self.failed = 0
+        self.latencies: List[float] = []
+        self.by_mutation: Dict[str, List[int]] = {}
+
+    def row(self) -> Dict[str, Any]:
+        healed = self.correct + self.wrong + self.failed
+        ordered = sorted(self.latencies)
+        return {
+            "lookups": self.lookups,
+            "intact": self.intact,
+            "heals": healed,
+            "correct": self.correct,
+            "wrong": self.wrong,
+            "failed": self.failed,
+            "accuracy": self.correct / healed if healed else 0.0,
+            "latency_p50": statistics.median(ordered) if ordered else 0.0,
+            "latency_p95": percentile(ordered, 95),
+            "by_mutation": {
+                k: round(v[0] / v[1], 3) for k, v in sorted(self.by_mutation.items())
+            },
+        }
+
+
+def evaluate(corpus: Iterator[CorpusPage], healers: List[str], locator: str = "id",
+             max_targets: Optional[int] = None, seed: int = 0) -> Dict[Tuple[str, int, float], Dict[str, Any]]:
+    """
+    Heal every broken target of every page with each healer and compare the
+    healed element's id with the ground truth.
+    """
+    rng = random.Random(seed)
+    stats: Dict[Tuple[str, int, float], _Stats] = {}
+    driver = StaticDriver()
+    # Healers never save during _heal_locator; the store path only has to not exist
+    scratch = os.path.join(tempfile.gettempdir(), f"autoheal-corpus-{os.getpid()}.json")
+    for page in corpus:
+        driver.load(page.html, url=f"corpus://{page.page_id}")
+        targets = page.targets
+        if max_targets and len(targets) > max_targets:
+            targets = rng.sample(targets, max_targets)
+        for label in healers:
+            ah = HEALERS[label](driver, locator_store_path=scratch, metrics_path=scratch, default_timeout=1e-6)
+            ah.store.save = lambda: None  # the corpus never writes the store
+            s = stats.setdefault((label, page.size, page.severity), _Stats())
+            for target in targets:
+                by, value = (By.CSS_SELECTOR, target.css) if locator == "css" else (target.original["by"], target.original["value"])
+                stored = LocatorInfo(**target.stored)
+                if locator == "css":
+                    stored.by, stored.value = by, value
+                ah.store.clear()
+                ah.store.set(target.name, stored)
+                s.lookups += 1
+                if driver.document.select(by, value):
+                    s.intact += 1
+                    continue
+                start = time.perf_counter()
+                healed = ah._heal_locator(target.name, by, value, 1e-6)
+                s.latencies.append(time.perf_counter() - start)
+                ok = False
+                if healed is None:
+                    s.failed += 1
+                else:
+                    found = driver.document.select(healed[0], healed[1])
+                    ok = bool(found) and found[0].attrs.get("id") == target.truth["value"]
+                    if ok:
+                        s.correct += 1
+                    else:
+                        s.wrong += 1
+                for kind in target.mutations or ["none"]:
+                    counts = s.by_mutation.setdefault(kind, [0, 0])
+                    counts[0] += int(ok)
+                    counts[1] += 1
+    return {k: v.row() for k, v in stats.items()}
+
+
+def print_evaluation(results: Dict[Tuple[str, int, float], Dict[str, Any]]) -> None:
+    print("\n" + "=" * 86)
+    print(f"  {'healer':<12} {'size':>7} {'sev':>5} {'lookups':>8} {'heals':>6} {'acc':>7} "
+          f"{'p50 ms':>9} {'p95 ms':>9}  per-mutation accuracy")
+    print("=" * 86)
+    for (label, size, severity), row in sorted(results.items()):
+        per_mutation = ", ".join(f"{k}={v:.2f}" for k, v in row["by_mutation"].items())
+        print(f"  {label:<12} {size:>7} {severity:>5g} {row['lookups']:>8} {row['heals']:>6} "
+              f"{row['accuracy']:>6.1%} {row['latency_p50'] * 1000:>9.3f} {row['latency_p95'] * 1000:>9.3f}  {per_mutation}")
+    print()
+
+
+def write_evaluation_csv(path: str, results: Dict[Tuple[str, int, float], Dict[str, Any]]) -> None:
+    columns = ["healer", "size", "severity", "lookups", "intact", "heals", "correct",
+               "wrong", "failed", "accuracy", "latency_p50", "latency_p95"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for (label, size, severity), row in sorted(results.items()):
+            writer.writerow([label, size, severity] + [row[c] for c in columns[3:]])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Synthetic DOM mutation corpus")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("generate", "evaluate"):
+        p = sub.add_parser(name)
+        p.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+        p.add_argument("--severity", nargs="+", type=float, default=[0.2, 0.5])
+        p.add_argument("--pages", type=int, default=1, help="pages per size/severity")
+        p.add_argument("--seed", type=int, default=0)
+    sub.choices["generate"].add_argument("--out", required=True)
+    evaluate_parser = sub.choices["evaluate"]
+    evaluate_parser.add_argument("--from", dest="source", help="read a generated corpus instead")
+    evaluate_parser.add_argument("--healers", nargs="+", choices=list(HEALERS), default=list(HEALERS))
+    evaluate_parser.add_argument("--locator", choices=["id", "css"], default="id")
+    evaluate_parser.add_argument("--max-targets", type=int, default=50,
+                                 help="targets sampled per page (0 = all)")
+    evaluate_parser.add_argument("--csv", help="write the summary table as CSV")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        count = write_corpus(args.out, iter_corpus(args.sizes, args.severity, args.pages, args.seed))
+        print(f"Wrote {count} pages to {args.out}")
+        return
+
+    # Healers log every attempt; keep corpus runs out of the scenario logs.
+    logging.basicConfig(handlers=[logging.NullHandler()], level=logging.INFO, force=True)
+    corpus = read_corpus(args.source) if args.source else iter_corpus(args.sizes, args.severity, args.pages, args.seed)
+    results = evaluate(corpus, args.healers, args.locator, args.max_targets or None, args.seed)
+    print_evaluation(results)
+    if args.csv:
+        write_evaluation_csv(args.csv, results)
+        print(f"Summary written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+"""
+Long-lived local healing daemon for the Python suites.
+
+One process keeps the LocatorStore in memory, parses every page it is sent
+once (an LRU keyed by content hash) and runs the existing healers against it
+on StaticDriver, so test processes no longer rebuild the store and candidate
+data themselves. Store writes are batched: lookups only mark the store dirty
+and a background thread flushes it every --flush-interval seconds.
+
+The supported front end is the native protocol, newline-delimited JSON
+over a local socket (default 127.0.0.1:7879, or a Unix socket path):
+    {"op": "page", "html": "..."}                        -> {"page_id": ...}
+    {"op": "heal", "name": ..., "by": ..., "value": ..., "page_id": ...}
+    {"op": "save", "name": ..., "by": ..., "value": ..., "page_id": ...}
+    {"op": "get", "name": ...} / {"op": "stats"}
+A line holding a list of requests is answered with a list (batching).
+HealingClient keeps a pool of persistent connections.
+
+--port also serves an HTTP JSON API that heals on the server and borrows
+Healenium's field names (locator, type, className, methodName, nodePath,
+pageContent):
+    POST /healenium/selector   save selector(s), or a list
+    GET  /healenium/selector   ?locator=&className=&methodName= -> stored locator
+    POST /healenium/healing    heal {locator, type, pageContent} here
+It is NOT a drop-in hlm-backend: Healenium's SelfHealingDriver heals on the
+client from stored node paths and posts its healing results back, and this
+API neither returns node paths nor stores those results. Keep the Java
+suite (Healenium_test) on the docker hlm-backend.
+
+Usage:
+  python daemon.py --native 127.0.0.1:7879 --strategy levenshtein
+  python daemon.py --port 7878 --native 127.0.0.1:7879
+  python daemon.py --native /tmp/autoheal.sock --store locator_store.json
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Any
+from urllib.parse import parse_qs, urlparse
+
+from selenium.webdriver.common.by import By
+
+from driver import LocatorInfo, LocatorStore
+from dom import Document, StaticDriver
+from corpus import HEALERS
+
+# Healenium sends the Java By factory name as the locator type
+HEALENIUM_TYPES = {
+    "By.id": By.ID,
+    "By.name": By.NAME,
+    "By.className": By.CLASS_NAME,
+    "By.cssSelector": By.CSS_SELECTOR,
+    "By.xpath": By.XPATH,
+    "By.tagName": By.TAG_NAME,
+    "By.linkText": By.LINK_TEXT,
+    "By.partialLinkText": By.PARTIAL_LINK_TEXT,
+}
+SELENIUM_TYPES = {v: k for k, v in HEALENIUM_TYPES.items()}
+
+
+class SharedStore(LocatorStore):
+    """
+    LocatorStore shared by all request threads. Reads and set() hold a lock
+    while families change; set() only marks the store dirty and flush()
+    writes a snapshot atomically.
+    """
+
+    def __init__(self, path: str = "locator_store.json"):
+        self._lock = threading.RLock()
+        self._dirty = False
+        super().__init__(path)
+
+    def get(self, name: str) -> Optional[LocatorInfo]:
+        with self._lock:
+            return super().get(name)
+
+    def from_family(self, by: str, value: str) -> Optional[LocatorInfo]:
+        with self._lock:
+            return super().from_family(by, value)
+
+    def set(self, name: str, info: LocatorInfo) -> None:
+        with self._lock:
+            super().set(name, info)  # calls save(), which only marks the store dirty
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            self._dirty = True
+
+    def flush(self) -> bool:
+        with self._lock:
+            if not self._dirty:
+                return False
+            raw = self._raw()
+            self._dirty = False
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(raw, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Failed to save locator store: {e}")
+            self._dirty = True
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._members)
+
+
+class PageCache:
+    """Parsed Documents keyed by the sha1 of their HTML, least recently used evicted."""
+
+    def __init__(self, max_pages: int = 64):
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[str, Document]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, html: str) -> str:
+        page_id = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        with self._lock:
+            if page_id in self._pages:
+                self._pages.move_to_end(page_id)
+                return page_id
+        document = Document(html)  # parse outside the lock
+        with self._lock:
+            self._pages[page_id] = document
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return page_id
+
+    def get(self, page_id: str) -> Document:
+        with self._lock:
+            document = self._pages.get(page_id)
+            if document is None:
+                raise KeyError(f"Unknown page_id {page_id}; send the page first")
+            self._pages.move_to_end(page_id)
+            return document
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+class HealingService:
+    def __init__(
+        self,
+        store_path: str = "locator_store.json",
+        strategy: str = "rules",
+        max_pages: int = 64,
+        flush_interval: float = 2.0,
+    ):
+        self.store = SharedStore(store_path)
+        self.pages = PageCache(max_pages)
+        self.healer_cls = HEALERS[strategy]
+        self.strategy = strategy
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        # Healers are built per request and never write their own store/metrics files
+        self._scratch = os.path.join(tempfile.gettempdir(), f"autoheal-daemon-{os.getpid()}.json")
+        self._flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="autoheal-store-flush", daemon=True)
+        self._flusher.start()
+
+    # --- operations ---
+
+    def put_page(self, html: str) -> str:
+        return self.pages.put(html)
+
+    def heal(self, name: str, by: str, value: str, page_id: Optional[str] = None,
+             html: Optional[str] = None) -> Dict[str, Any]:
+        ah = self._healer(page_id, html)
+        try:
+            ah.find(name, by, value)
+        except Exception:
+            self._count("failed")
+            return {"name": name, "found": False}
+        info = self.store.get(name)
+        healed = (info.by, info.value) != (by, value)
+        self._count("healed" if healed else "found")
+        return {
+            "name": name,
+            "found": True,
+            "healed": healed,
+            "by": info.by,
+            "value": info.value,
+            "reason": info.heal_reason,
+            "attributes": info.attributes,
+        }
+
+    def save(self, name: str, by: str, value: str, page_id: Optional[str] = None,
+             html: Optional[str] = None, attributes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        if attributes is None and (page_id or html):
+            ah = self._healer(page_id, html)
+            try:
+                element = ah.driver.find_element(by, value)
+            except Exception:
+                self._count("save_failed")
+                return {"name": name, "saved": False}
+            ah._on_success(name, by, value, healed=False, element=element)
+        else:
+            self.store.set(name, LocatorInfo(by=by, value=value, attributes=attributes or None))
+        self._count("saved")
+        return {"name": name, "saved": True}
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        info = self.store.get(name)
+        return asdict(info) if info else None
+
+    def summary(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counts = dict(self.stats)
+        return {"strategy": self.strategy, "locators": len(self.store), "pages": len(self.pages), **counts}
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs one native-protocol request; errors are returned, never raised."""
+        self._count("requests")
+        try:
+            op = request.get("op")
+            if op == "page":
+                return {"page_id": self.put_page(request["html"])}
+            if op == "heal":
+                return self.heal(request["name"], request["by"], request["value"],
+                                 request.get("page_id"), request.get("html"))
+            if op == "save":
+                return self.save(request["name"], request["by"], request["value"],
+                                 request.get("page_id"), request.get("html"), request.get("attributes"))
+            if op == "get":
+                return {"name": request["name"], "locator": self.get(request["name"])}
+            if op == "stats":
+                return self.summary()
+            return {"error": f"Unknown op {op!r}"}
+        except Exception as e:
+            self._count("errors")
+            return {"error": f"{e.__class__.__name__}: {e}"}
+
+    # --- lifecycle ---
+
+    def close(self) -> None:
+        self._stop.set()
+        self._flusher.join()
+        self.store.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self._flush_interval):
+            self.store.flush()
+
+    # --- helpers ---
+
+    def _healer(self, page_id: Optional[str], html: Optional[str]):
+        if page_id is None:
+            if html is None:
+                raise ValueError("A page_id or the page html is required")
+            page_id = self.put_page(html)
+        driver = StaticDriver()
+        driver.document = self.pages.get(page_id)
+        ah = self.healer_cls(driver, locator_store_path=self._scratch, metrics_path=self._scratch,
+                             default_timeout=1e-6)
+        ah.store = self.store
+        return ah
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+# --- HTTP API (Healenium field names, server-side healing) ---
+
+def healenium_key(body: Dict[str, Any]) -> str:
+    """Healenium identifies a selector by locator + calling class and method."""
+    caller = ".".join(p for p in (body.get("className"), body.get("methodName")) if p)
+    return f"{caller}/{body['locator']}" if caller else body["locator"]
+
+
+def node_attributes(node: Dict[str, Any]) -> Dict[str, str]:
+    """Maps the last node of a Healenium nodePath onto the attributes _on_success captures."""
+    attributes = {"tag": node.get("tag", "")}
+    if node.get("id"):
+        attributes["id"] = node["id"]
+    if node.get("classes"):
+        attributes["class"] = " ".join(node["classes"])
+    other = node.get("otherAttributes") or {}
+    for attr in ("name", "type"):
+        if other.get(attr):
+            attributes[attr] = str(other[attr])
+    if node.get("innerText") and attributes["tag"] not in ("input", "select", "textarea"):
+        attributes["text"] = node["innerText"][:50]
+    return attributes
+
+
+class _HealeniumHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for the client's pooled connections
+    service: HealingService
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path.rstrip("/")
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"null")
+            if path == "/healenium/selector":
+                requests = body if isinstance(body, list) else [body]
+                self._reply(200, [self._save(r) for r in requests])
+            elif path == "/healenium/healing":
+                self._reply(200, self._heal(body))
+            else:
+                self._reply(404, {"error": f"Unknown endpoint {path}"})
+        except Exception as e:
+            self._reply(400, {"error": f"{e.__class__.__name__}: {e}"})
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        if path == "/healenium/selector":
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if "locator" not in query:
+                self._reply(400, {"error": "locator is required"})
+                return
+            stored = self.service.get(healenium_key(query))
+            self._reply(200 if stored else 404, self._reference(query, stored))
+        elif path == "/healenium/stats":
+            self._reply(200, self.service.summary())
+        else:
+            self._reply(404, {"error": f"Unknown endpoint {path}"})
+
+    def _save(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        by = HEALENIUM_TYPES.get(body.get("type"), By.CSS_SELECTOR)
+        node_path = body.get("nodePath") or []
+        attributes = node_attributes(node_path[-1]) if node_path else None
+        result = self.service.save(healenium_key(body), by, body["locator"],
+                                   html=body.get("pageContent"), attributes=attributes)
+        return {"locator": body["locator"], "saved": result["saved"]}
+
+    def _heal(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        by = HEALENIUM_TYPES.get(body.get("type"), By.CSS_SELECTOR)
+        result = self.service.heal(healenium_key(body), by, body["locator"], html=body["pageContent"])
+        if not result["found"]:
+            return {"locator": body["locator"], "type": body.get("type"), "healed": False, "results": []}
+        healed = {"locator": result["value"], "type": SELENIUM_TYPES.get(result["by"], result["by"]),
+                  "score": 1.0, "reason": result["reason"]}
+        return {"locator": body["locator"], "type": body.get("type"), "healed": result["healed"],
+                "results": [healed]}
+
+    @staticmethod
+    def _reference(query: Dict[str, str], stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if stored is None:
+            return {"locator": query["locator"], "found": False}
+        return {"locator": stored["value"], "type": SELENIUM_TYPES.get(stored["by"], stored["by"]),
+                "found": True, "attributes": stored["attributes"]}
+
+    def _reply(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug("HTTP %s", format % args)
+
+
+# --- native protocol ---
+
+class _NativeHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        service: HealingService = self.server.service
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                reply: Any = {"error": f"Invalid JSON: {e}"}
+            else:
+                if isinstance(request, list):
+                    reply = [service.dispatch(r) for r in request]
+                else:
+                    reply = service.dispatch(request)
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def parse_address(address: str):
+    """'host:port' -> (host, port); anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def make_native_server(address: str, service: HealingService) -> socketserver.BaseServer:
+    parsed = parse_address(address)
+    if isinstance(parsed, tuple):
+        server = _ThreadingTCPServer(parsed, _NativeHandler)
+    else:
+        if os.path.exists(parsed):
+            os.remove(parsed)
+
+        class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        server = _ThreadingUnixServer(parsed, _NativeHandler)
+    server.service = service
+    return server
+
+
+def make_http_server(host: str, port: int, service: HealingService) -> ThreadingHTTPServer:
+    handler = type("HealeniumHandler", (_HealeniumHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class HealingClient:
+    """
+    Client for the native protocol with a pool of persistent connections.
+
+        with HealingClient("127.0.0.1:7879") as client:
+            page_id = client.put_page(driver.page_source)
+            results = client.batch([{"op": "heal", "name": n, "by": b, "value": v, "page_id": page_id}
+                                    for n, b, v in lookups])
+    """
+
+    def __init__(self, address: str = "127.0.0.1:7879", pool_size: int = 4, timeout: float = 30.0):
+        self.address = parse_address(address)
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[Any]" = queue.LifoQueue(maxsize=pool_size)
+
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._connection() as conn:
+            return self._roundtrip(conn, request)
+
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not requests:
+            return []
+        with self._connection() as conn:
+            return self._roundtrip(conn, requests)
+
+    def put_page(self, html: str) -> str:
+        return self.request({"op": "page", "html": html})["page_id"]
+
+    def heal(self, name: str, by: str, value: str, page_id: str) -> Dict[str, Any]:
+        return self.request({"op": "heal", "name": name, "by": by, "value": value, "page_id": page_id})
+
+    def save(self, name: str, by: str, value: str, page_id: str) -> Dict[str, Any]:
+        return self.request({"op": "save", "name": name, "by": by, "value": value, "page_id": page_id})
+
+    def close(self) -> None:
+        while True:
+            try:
+                sock, stream = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            stream.close()
+            sock.close()
+
+    def __enter__(self) -> "HealingClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        except Exception:
+            conn[1].close()
+            conn[0].close()
+            raise
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn[1].close()
+            conn[0].close()
+
+    def _connect(self):
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock, sock.makefile("rwb")
+
+    @staticmethod
+    def _roundtrip(conn, payload: Any) -> Any:
+        stream = conn[1]
+        stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Healing daemon closed the connection")
+        return json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Long-lived local healing daemon")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=0, help="HTTP JSON API port, server-side healing only (0 = off)")
+    parser.add_argument("--native", default="127.0.0.1:7879",
+                        help="native protocol address, host:port or a Unix socket path ('' = off)")
+    parser.add_argument("--store", default="locator_store.json")
+    parser.add_argument("--strategy", choices=list(HEALERS), default="rules")
+    parser.add_argument("--max-pages", type=int, default=64, help="parsed pages kept in memory")
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="seconds between store writes")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    # Healers log every attempt at INFO; the daemon gets its own log file.
+    logging.basicConfig(filename=os.path.join("logs", "daemon.log"), level=args.log_level,
+                        format="%(asctime)s [%(levelname)s] %(message)s", force=True)
+
+    service = HealingService(args.store, args.strategy, args.max_pages, args.flush_interval)
+    servers: List[socketserver.BaseServer] = []
+    if args.port:
+        servers.append(make_http_server(args.host, args.port, service))
+        print(f"HTTP API (not a Healenium backend) on http://{args.host}:{args.port}/healenium")
+    if args.native:
+        servers.append(make_native_server(args.native, service))
+        print(f"Native API on {args.native}")
+    if not servers:
+        parser.error("nothing to serve: set --port and/or --native")
+
+    threads = [threading.Thread(target=s.serve_forever, daemon=True) for s in servers]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for s in servers:
+            s.shutdown()
+            s.server_close()
+        service.close()
+        print(f"Stopped. {service.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Browserless DOM for benchmarks and offline evaluation.
+
+StaticDriver parses an HTML file or string once and answers the subset of
+the WebDriver API the healing drivers use (find_element(s), get_attribute,
+text, page_source). It supports ID, NAME, CLASS_NAME, TAG_NAME, simple
+compound CSS selectors and the XPath shapes our healers build (parsed by
+locator_steps.py). Nothing is rendered and no JavaScript runs.
+"""
+
+import os
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Union
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    WebDriverException,
+)
+
+from locator_steps import Step, match_attr, parse_locator
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+HIDDEN_TAGS = {"head", "script", "style", "template", "title"}
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_space(text: str) -> str:
+    return _WS.sub(" ", text).strip()
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent", "index")
+
+    def __init__(self, tag: str, attrs: Dict[str, Optional[str]], parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Union["Node", str]] = []
+        self.parent = parent
+        self.index = 0  # position in document order
+
+    def elements(self) -> List["Node"]:
+        return [c for c in self.children if isinstance(c, Node)]
+
+    def own_texts(self) -> List[str]:
+        return [c for c in self.children if isinstance(c, str)]
+
+    def string_value(self) -> str:
+        parts: List[str] = []
+        stack: List[Union[Node, str]] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            else:
+                stack.extend(reversed(item.children))
+        return "".join(parts)
+
+    def visible_text(self) -> str:
+        parts: List[str] = []
+        stack: List[Union[Node, str]] = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif item.tag not in HIDDEN_TAGS:
+                stack.extend(reversed(item.children))
+        return normalize_space("".join(parts))
+
+    def classes(self) -> List[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def contains(self, other: "Node") -> bool:
+        while other is not None:
+            if other is self:
+                return True
+            other = other.parent
+        return False
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self._open: List[Node] = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, dict(attrs), self._open[-1])
+        self._open[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self._open.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, dict(attrs), self._open[-1])
+        self._open[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._open) - 1, 0, -1):
+            if self._open[i].tag == tag:
+                del self._open[i:]
+                return
+
+    def handle_data(self, data):
+        self._open[-1].children.append(data)
+
+
+class Document:
+    """
+    Parsed page with id/tag indexes so lookups on large pages don't scan
+    every node.
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.root = builder.root
+        self.nodes: List[Node] = []
+        self.by_id: Dict[str, List[Node]] = {}
+        self.by_tag: Dict[str, List[Node]] = {}
+        stack = list(reversed(self.root.elements()))
+        while stack:
+            node = stack.pop()
+            node.index = len(self.nodes)
+            self.nodes.append(node)
+            if node.attrs.get("id"):
+                self.by_id.setdefault(node.attrs["id"], []).append(node)
+            self.by_tag.setdefault(node.tag, []).append(node)
+            stack.extend(reversed(node.elements()))
+
+    def select(self, by: str, value: str, scope: Optional[Node] = None) -> List[Node]:
+        if by == By.ID:
+            found = self.by_id.get(value, [])
+        elif by == By.NAME:
+            found = [n for n in self.nodes if n.attrs.get("name") == value]
+        elif by == By.CLASS_NAME:
+            if not value or " " in value.strip():
+                raise InvalidSelectorException(f"Compound class names not permitted: {value}")
+            found = [n for n in self.nodes if value in n.classes()]
+        elif by == By.TAG_NAME:
+            found = self.by_tag.get(value.lower(), [])
+        elif by in (By.CSS_SELECTOR, By.XPATH):
+            found = self._match_steps(parse_locator(by, value))
+        else:
+            raise InvalidSelectorException(f"Unsupported locator strategy: {by}")
+        if scope is not None:
+            found = [n for n in found if n is not scope and scope.contains(n)]
+        return found
+
+    def _match_steps(self, steps: Sequence[Step]) -> List[Node]:
+        last = steps[-1]
+        if last.id is not None:
+            candidates = self.by_id.get(last.id, [])
+        elif last.tag is not None:
+            candidates = self.by_tag.get(last.tag, [])
+        else:
+            candidates = self.nodes
+        return [n for n in candidates if _match_chain(n, steps, len(steps) - 1)]
+
+
+# --- selector matching ---
+
+def _match_step(node: Node, step: Step) -> bool:
+    if step.tag is not None and node.tag != step.tag:
+        return False
+    if step.id is not None and node.attrs.get("id") != step.id:
+        return False
+    if step.classes:
+        classes = node.classes()
+        if any(c not in classes for c in step.classes):
+            return False
+    for name, op, expected in step.attrs:
+        if name not in node.attrs:
+            return False
+        if not match_attr((node.attrs[name] or ""), op, expected):
+            return False
+    if step.text is not None and not _match_text(node, *step.text):
+        return False
+    if step.position is not None:
+        parent = node.parent
+        siblings = [c for c in parent.elements() if step.tag is None or c.tag == step.tag] if parent else [node]
+        if step.position > len(siblings) or siblings[step.position - 1] is not node:
+            return False
+    return True
+
+
+def _match_text(node: Node, mode: str, expected: str) -> bool:
+    if mode == "text":
+        return any(t == expected for t in node.own_texts())
+    if mode == "contains-text":
+        return any(expected in t for t in node.own_texts())
+    if mode == "normalized":
+        return normalize_space(node.string_value()) == expected
+    if mode == "contains":
+        return expected in node.string_value()
+    return False
+
+
+def _match_chain(node: Node, steps: Sequence[Step], i: int) -> bool:
+    if not _match_step(node, steps[i]):
+        return False
+    if i == 0:
+        if steps[0].axis == "child":
+            return node.parent is not None and node.parent.tag == "#document"
+        return True
+    parent = node.parent
+    if steps[i].axis == "child":
+        return parent is not None and parent.tag != "#document" and _match_chain(parent, steps, i - 1)
+    while parent is not None and parent.tag != "#document":
+        if _match_chain(parent, steps, i - 1):
+            return True
+        parent = parent.parent
+    return False
+
+
+# --- WebDriver facade ---
+
+class ScriptsUnsupported(WebDriverException):
+    """Raised by drivers that can't run JavaScript at all, as opposed to a script failing."""
+
+
+class StaticElement:
+    def __init__(self, driver: "StaticDriver", node: Node):
+        self._driver = driver
+        self._node = node
+
+    @property
+    def id(self) -> str:
+        return f"static-{self._node.index}"
+
+    @property
+    def tag_name(self) -> str:
+        self._driver.commands["getElementTagName"] += 1
+        return self._node.tag
+
+    @property
+    def text(self) -> str:
+        self._driver.commands["getElementText"] += 1
+        return self._node.visible_text()
+
+    @property
+    def own_text(self) -> str:
+        """Raw text of the element's own text nodes, without its descendants'."""
+        self._driver.commands["getElementText"] += 1
+        node: Optional[Node] = self._node
+        while node is not None:
+            if node.tag in HIDDEN_TAGS:
+                return ""
+            node = node.parent
+        return "".join(self._node.own_texts())
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        self._driver.commands["getElementAttribute"] += 1
+        if name not in self._node.attrs:
+            return None
+        value = self._node.attrs[name]
+        return "true" if value is None else value
+
+    get_dom_attribute = get_attribute
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return "disabled" not in self._node.attrs
+
+    def click(self) -> None:
+        self._driver.commands["clickElement"] += 1
+
+    def send_keys(self, *value) -> None:
+        self._driver.commands["sendKeysToElement"] += 1
+
+    def clear(self) -> None:
+        self._driver.commands["clearElement"] += 1
+
+    def find_element(self, by: str = By.ID, value: Optional[str] = None) -> "StaticElement":
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return found[0]
+
+    def find_elements(self, by: str = By.ID, value: Optional[str] = None) -> List["StaticElement"]:
+        self._driver.commands["findChildElements"] += 1
+        found = self._driver.document.select(by, value, scope=self._node)
+        self._driver.elements_returned += len(found)
+        return [StaticElement(self._driver, n) for n in found]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StaticElement) and other._node is self._node
+
+    def __hash__(self) -> int:
+        return id(self._node)
+
+    def __repr__(self) -> str:
+        return f"<StaticElement {self._node.tag} id={self._node.attrs.get('id')!r}>"
+
+
+class StaticDriver:
+    """
+    Minimal stand-in for selenium's WebDriver backed by a parsed Document.
+    `commands` counts the WebDriver round trips a real session would make;
+    `elements_returned` counts the candidates find_elements handed back.
+    """
+
+    def __init__(self, html: Optional[str] = None, url: str = "about:blank"):
+        self.commands: Counter = Counter()
+        self.elements_returned = 0
+        self.current_url = url
+        self.document = Document(html or "<html><body></body></html>")
+
+    @staticmethod
+    def url_to_path(url: str) -> str:
+        path = url.split("file://", 1)[1] if url.startswith("file://") else url
+        while path.startswith("//"):
+            path = path[1:]
+        if re.match(r"^/[A-Za-z]:", path):
+            path = path[1:]
+        return path
+
+    def get(self, url: str) -> None:
+        self.commands["get"] += 1
+        with open(self.url_to_path(url), "r", encoding="utf-8") as f:
+            self.document = Document(f.read())
+        self.current_url = url
+
+    def load(self, html: str, url: str = "about:blank") -> None:
+        self.document = Document(html)
+        self.current_url = url
+
+    @property
+    def page_source(self) -> str:
+        self.commands["getPageSource"] += 1
+        return self.document.html
+
+    @property
+    def title(self) -> str:
+        titles = self.document.by_tag.get("title")
+        return normalize_space(titles[0].string_value()) if titles else ""
+
+    def find_element(self, by: str = By.ID, value: Optional[str] = None) -> StaticElement:
+        self.commands["findElement"] += 1
+        found = self.document.select(by, value)
+        if not found:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return StaticElement(self, found[0])
+
+    def find_elements(self, by: str = By.ID, value: Optional[str] = None) -> List[StaticElement]:
+        self.commands["findElements"] += 1
+        found = self.document.select(by, value)
+        self.elements_returned += len(found)
+        return [StaticElement(self, n) for n in found]
+
+    def execute_script(self, script: str, *args):
+        raise ScriptsUnsupported("StaticDriver does not run JavaScript")
+
+    def get_log(self, log_type: str) -> List[Dict]:
+        return []
+
+    def quit(self) -> None:
+        pass
+
+
+def load_page(path: str) -> StaticDriver:
+    driver = StaticDriver()
+    driver.get(f"file:///{os.path.abspath(path)}")
+    return driver
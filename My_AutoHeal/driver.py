@@ -1,13 +1,16 @@
 import json
 import logging
 import os
+import re
 import time
-from dataclasses import dataclass, asdict
-from typing import Dict, Optional, Tuple, Any
+from collections import Counter
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Any
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import (
+    InvalidSelectorException,
     NoSuchElementException,
     StaleElementReferenceException,
     TimeoutException,
@@ -16,6 +19,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webelement import WebElement
 
+from locator_steps import Step, format_locator, parse_locator, relaxations
+from text_index import TextIndex
+from element_cache import ElementCache
+
 
 
 os.makedirs("logs", exist_ok=True)
@@ -26,6 +33,15 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
 )
 
+# Marks the text fallback in the heal attempt list; resolved through TextIndex
+TEXT_INDEX = "text index"
+
+
+def expired(deadline: Optional[float]) -> bool:
+    """True once a heal deadline (a time.time() value) has passed; None never expires."""
+    return deadline is not None and time.time() >= deadline
+
+
 @dataclass
 class LocatorInfo:
     by: str
@@ -36,6 +52,123 @@ class LocatorInfo:
     attributes: Optional[Dict[str, str]] = None
 
 
+# Families: locators that differ only in one alphanumeric token (the parameter),
+# e.g. delete-alice-btn-primary / delete-bob-btn-primary -> delete-{}-btn-primary
+FAMILY_PARAM = "{}"
+FAMILY_STRATEGIES = {By.ID, By.NAME}
+FAMILIES_KEY = "__families__"
+MIN_FAMILY_SIZE = 3
+# The captured attribute that holds the templated slot, per strategy
+SLOT_ATTRIBUTES = {By.ID: "id", By.NAME: "name"}
+_FAMILY_SPLIT = re.compile(r"([^A-Za-z0-9]+)")
+
+
+def locator_templates(value: str) -> List[Tuple[str, str]]:
+    """
+    (template, parameter) for every token of `value` that could be a family
+    parameter. At least two other tokens must stay literal, so short
+    generic locators don't group.
+    """
+    if FAMILY_PARAM in value:
+        return []
+    parts = _FAMILY_SPLIT.split(value)
+    tokens = [i for i in range(0, len(parts), 2) if parts[i]]
+    if len(tokens) < 3:
+        return []
+    return [
+        ("".join(parts[:i]) + FAMILY_PARAM + "".join(parts[i + 1:]), parts[i])
+        for i in tokens
+    ]
+
+
+def match_template(template: str, value: str) -> Optional[str]:
+    """The parameter if `value` is an instance of `template`, else None."""
+    prefix, _, suffix = template.partition(FAMILY_PARAM)
+    if len(value) <= len(prefix) + len(suffix) or not value.startswith(prefix) or not value.endswith(suffix):
+        return None
+    param = value[len(prefix):len(value) - len(suffix)]
+    return param if param.isalnum() else None
+
+
+def attribute_shape(attributes: Optional[Dict[str, str]], param: str) -> Optional[Tuple[Optional[str], ...]]:
+    """
+    What a family member looks like apart from its parameter: tag, type,
+    class and text, with the parameter templated out. None when nothing was
+    captured, which is compatible with any shape.
+    """
+    if not attributes:
+        return None
+
+    def templated(text: Optional[str]) -> Optional[str]:
+        return text.replace(param, FAMILY_PARAM) if text else text
+
+    classes = " ".join(sorted((attributes.get("class") or "").split()))
+    return (attributes.get("tag"), attributes.get("type"), templated(classes), templated(attributes.get("text")))
+
+
+def _compatible(shape: Optional[Tuple[Optional[str], ...]], other: Optional[Tuple[Optional[str], ...]]) -> bool:
+    return shape is None or other is None or shape == other
+
+
+@dataclass
+class FamilyMember:
+    """One member's own state; only the locator is shared with the family."""
+    param: str
+    healed: bool = False
+    heal_reason: Optional[str] = None
+    last_success_ts: Optional[float] = None
+    attributes: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class LocatorFamily:
+    """
+    One store entry for a family of parameterized locators. healed and
+    heal_reason describe a rewrite of the pattern itself and carry over to
+    new instances; aliases are the (by, template) pairs the family had
+    before it was healed.
+    """
+    by: str
+    template: str
+    members: Dict[str, FamilyMember] = field(default_factory=dict)
+    healed: bool = False
+    heal_reason: Optional[str] = None
+    aliases: List[List[str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        # Members come in as plain dicts when loaded from JSON
+        self.members = {
+            name: m if isinstance(m, FamilyMember) else FamilyMember(**m)
+            for name, m in self.members.items()
+        }
+
+    def value(self, param: str) -> str:
+        return self.template.replace(FAMILY_PARAM, param)
+
+    def info(self, name: str) -> LocatorInfo:
+        member = self.members[name]
+        return LocatorInfo(
+            by=self.by,
+            value=self.value(member.param),
+            healed=member.healed,
+            heal_reason=member.heal_reason,
+            last_success_ts=member.last_success_ts,
+            attributes=dict(member.attributes) if member.attributes else None,
+        )
+
+    def shape(self, without: Optional[str] = None) -> Optional[Tuple[Optional[str], ...]]:
+        """The shared attribute_shape of the members (other than `without`) that captured attributes."""
+        for name, member in self.members.items():
+            shape = attribute_shape(member.attributes, member.param) if name != without else None
+            if shape is not None:
+                return shape
+        return None
+
+    def instance(self, param: str) -> LocatorInfo:
+        """Locator for a new instance, which has no captured attributes of its own."""
+        return LocatorInfo(by=self.by, value=self.value(param), healed=self.healed, heal_reason=self.heal_reason)
+
+
 @dataclass
 class Metrics:
     locators_tried: int = 0
@@ -48,15 +181,79 @@ class Metrics:
         return asdict(self)
 
 
+class MetricsHistory:
+    """
+    Cumulative metrics across runs.
+
+    The aggregate file holds only running totals, so recording a run reads
+    and rewrites a constant-size document. Each run's own counters are
+    appended to a JSONL file next to it, keyed by run_id, for later queries.
+    """
+
+    def __init__(self, path: str = "metrics_history.json"):
+        self.path = path
+        self.runs_path = os.path.splitext(path)[0] + "_runs.jsonl"
+
+    def totals(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {"runs": 0, "last_run_id": None, "totals": Metrics().to_dict()}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def record(self, run_id: str, metrics: Metrics, started_at: float, ended_at: float) -> None:
+        try:
+            aggregate = self.totals()
+            for key, value in metrics.to_dict().items():
+                aggregate["totals"][key] = aggregate["totals"].get(key, 0) + value
+            aggregate["runs"] += 1
+            aggregate["last_run_id"] = run_id
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(aggregate, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+            run = {"run_id": run_id, "started_at": started_at, "ended_at": ended_at, **metrics.to_dict()}
+            with open(self.runs_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(run) + "\n")
+        except Exception as e:
+            logging.error(f"Failed to record metrics history: {e}")
+
+    def runs(self) -> Iterator[Dict]:
+        if not os.path.exists(self.runs_path):
+            return
+        with open(self.runs_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        for run in self.runs():
+            if run["run_id"] == run_id:
+                return run
+        return None
+
+
 class LocatorStore:
     """
     Maps logical element names -> LocatorInfo, stored as JSON.
     This is the 'memory' that makes the system adapt between runs.
+
+    Entries whose ids/names differ only in one token (table rows, per-user
+    or per-product buttons) and whose captured tag/type/class/text agree
+    are kept as one LocatorFamily once MIN_FAMILY_SIZE of them exist. Members keep their own heal state and attributes; healing one
+    member rewrites the shared template, so every sibling, and every new
+    instance found through from_family(), resolves to the healed pattern
+    without healing again.
     """
 
     def __init__(self, path: str = "locator_store.json"):
         self.path = path
         self._data: Dict[str, LocatorInfo] = {}
+        self._members: Dict[str, LocatorFamily] = {}
+        # (by, template) -> family, for current templates and aliases
+        self._families: Dict[Tuple[str, str], LocatorFamily] = {}
+        # (by, template) -> individual entries that are instances of it
+        self._signatures: Dict[Tuple[str, str], Set[str]] = {}
         self._load()
 
     def _load(self) -> None:
@@ -65,26 +262,175 @@ class LocatorStore:
         try:
             with open(self.path, "r", encoding="utf-8") as f:
                 raw = json.load(f)
+            for family in raw.pop(FAMILIES_KEY, []):
+                self._add_family(LocatorFamily(**family))
             for name, info in raw.items():
                 self._data[name] = LocatorInfo(**info)
+            for name in list(self._data):
+                if name in self._data:
+                    self._group(name)
         except Exception as e:
             logging.error(f"Failed to load locator store: {e}")
 
+    def _raw(self) -> Dict[str, Any]:
+        raw: Dict[str, Any] = {k: asdict(v) for k, v in self._data.items()}
+        families = {id(f): f for f in self._members.values()}
+        if families:
+            raw[FAMILIES_KEY] = [asdict(f) for f in families.values()]
+        return raw
+
     def save(self) -> None:
         try:
-            raw = {k: asdict(v) for k, v in self._data.items()}
+            raw = self._raw()
             with open(self.path, "w", encoding="utf-8") as f:
                 json.dump(raw, f, indent=2)
         except Exception as e:
             logging.error(f"Failed to save locator store: {e}")
 
+    def clear(self) -> None:
+        """Forgets every entry and family; the next save() writes the empty store."""
+        self._data = {}
+        self._members = {}
+        self._families = {}
+        self._signatures = {}
+
     def get(self, name: str) -> Optional[LocatorInfo]:
-        return self._data.get(name)
+        info = self._data.get(name)
+        if info is None and name in self._members:
+            return self._members[name].info(name)
+        return info
+
+    def from_family(self, by: str, value: str) -> Optional[LocatorInfo]:
+        """Locator for a not-yet-stored instance of a known family (a new table row)."""
+        for template, param in locator_templates(value):
+            family = self._families.get((by, template))
+            if family is not None:
+                return family.instance(param)
+        return None
 
     def set(self, name: str, info: LocatorInfo) -> None:
+        family = self._members.get(name)
+        if family is not None:
+            member = family.members[name]
+            param = member.param
+            same_locator = (info.by, info.value) == (family.by, family.value(param))
+            if same_locator and self._fits(family, name, param, info.attributes):
+                # A later find on the healed locator passes no reason; keep the heal's
+                heal_reason = info.heal_reason or (member.heal_reason if info.healed else None)
+                family.members[name] = FamilyMember(
+                    param, info.healed, heal_reason, info.last_success_ts, info.attributes)
+                self.save()
+                return
+            if (not same_locator and info.healed
+                    and (info.value.replace(param, FAMILY_PARAM), param) in locator_templates(info.value)):
+                self._rewrite(family, name, info)
+                self.save()
+                return
+            self._leave(name)
         self._data[name] = info
+        self._group(name)
         self.save()
 
+    # --- families ---
+
+    def _group(self, name: str) -> None:
+        """Moves an individual entry into a family if it is an instance of one."""
+        info = self._data[name]
+        if info.by not in FAMILY_STRATEGIES:
+            return
+        candidates = locator_templates(info.value)
+        for template, param in candidates:
+            family = self._families.get((info.by, template))
+            if family is not None and family.template == template and family.by == info.by:
+                if any(m.param == param for m in family.members.values()):
+                    return  # another name for a member's element: keep it separate
+                if self._fits(family, name, param, info.attributes):
+                    self._join(family, name, param, info)
+                    return
+        for template, param in candidates:
+            key = (info.by, template)
+            if key in self._families:
+                continue  # a family this entry doesn't fit; don't start a rival one
+            found = {name: param}
+            for n in self._signatures.get(key, ()):
+                if n != name and n in self._data and self._data[n].by == info.by:
+                    sibling_param = match_template(template, self._data[n].value)
+                    if sibling_param:
+                        found[n] = sibling_param
+            # Names sharing one locator value are aliases, not family members
+            counts = Counter(found.values())
+            shapes = {n: attribute_shape(self._data[n].attributes, p) for n, p in found.items() if counts[p] == 1}
+            # Same locator pattern, different widget (btn_save_profile / btn_save_settings)
+            # isn't a family: members must agree on whatever they captured
+            shape = shapes.get(name)
+            if shape is None:
+                known = Counter(s for s in shapes.values() if s is not None)
+                shape = known.most_common(1)[0][0] if known else None
+            members = {n: found[n] for n, s in shapes.items() if _compatible(shape, s)}
+            if name in members and len(members) >= MIN_FAMILY_SIZE:
+                family = LocatorFamily(by=info.by, template=template)
+                self._add_family(family)
+                for member, member_param in members.items():
+                    self._join(family, member, member_param, self._data[member])
+                logging.info("Grouped %d locators into family %s=%s", len(family.members), family.by, template)
+                return
+        for template, _ in candidates:
+            self._signatures.setdefault((info.by, template), set()).add(name)
+
+    def _add_family(self, family: LocatorFamily) -> None:
+        self._families[(family.by, family.template)] = family
+        for alias_by, alias_template in family.aliases:
+            self._families.setdefault((alias_by, alias_template), family)
+        for name in family.members:
+            self._members[name] = family
+
+    def _fits(self, family: LocatorFamily, name: str, param: str, attributes: Optional[Dict[str, str]]) -> bool:
+        """Whether `name` looks like the family's other members."""
+        return _compatible(family.shape(without=name), attribute_shape(attributes, param))
+
+    def _join(self, family: LocatorFamily, name: str, param: str, info: LocatorInfo) -> None:
+        family.members[name] = FamilyMember(
+            param, info.healed, info.heal_reason, info.last_success_ts, info.attributes)
+        self._members[name] = family
+        self._data.pop(name, None)
+        for template, _ in locator_templates(info.value):
+            self._signatures.get((info.by, template), set()).discard(name)
+
+    def _leave(self, name: str) -> None:
+        family = self._members.pop(name)
+        del family.members[name]
+        if not family.members:
+            for key in [k for k, f in self._families.items() if f is family]:
+                del self._families[key]
+
+    def _rewrite(self, family: LocatorFamily, name: str, info: LocatorInfo) -> None:
+        """Applies one member's heal to the whole family's locator."""
+        param = family.members[name].param
+        slot = SLOT_ATTRIBUTES.get(family.by)
+        healed_slot = (info.attributes or {}).get(slot) if slot else None
+        slot_template = (healed_slot.replace(param, FAMILY_PARAM)
+                         if healed_slot and healed_slot.count(param) == 1 else None)
+        old_template = family.template
+        family.aliases.append([family.by, family.template])
+        family.by = info.by
+        family.template = info.value.replace(param, FAMILY_PARAM)
+        family.healed = True
+        family.heal_reason = info.heal_reason
+        for member_name, member in family.members.items():
+            if member_name == name:
+                family.members[name] = FamilyMember(
+                    param, True, info.heal_reason, info.last_success_ts, info.attributes)
+                continue
+            member.healed = True
+            member.heal_reason = info.heal_reason
+            # Only the templated slot changes; every other attribute stays the member's own
+            old_value = old_template.replace(FAMILY_PARAM, member.param)
+            if slot_template and member.attributes and member.attributes.get(slot) == old_value:
+                member.attributes[slot] = slot_template.replace(FAMILY_PARAM, member.param)
+        self._families[(family.by, family.template)] = family
+        logging.info("Healed locator family -> %s=%s (%d members)", family.by, family.template, len(family.members))
+
+
 class AutoHealingDriver:
     """
     Wraps a Selenium WebDriver to add:
@@ -101,16 +447,40 @@ class AutoHealingDriver:
         metrics_path: str = "metrics.json",
         default_timeout: int = 10,
         log_path: Optional[str] = None,
+        events=None,
+        run_id: Optional[str] = None,
+        history_path: Optional[str] = None,
+        cache_elements: bool = True,
     ):
         self.driver = driver
         self.store = LocatorStore(locator_store_path)
         self.metrics_path = metrics_path
         self.default_timeout = default_timeout
+        # Live counters are authoritative and cover this run only; past runs
+        # live in MetricsHistory (default: <metrics>_history.json).
         self.metrics = Metrics()
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.started_at = time.time()
+        self.history = MetricsHistory(
+            history_path or os.path.splitext(metrics_path)[0] + "_history.json"
+        )
         self.log_path = log_path
+        # Optional events.EventLogger; structured events are emitted alongside the text log
+        self.events = events
+        self._text_index: Optional[TextIndex] = None
+        # Handles from earlier finds on this page, keyed by resolved locator and
+        # checked against in-page mutations in the same round trip as the lookup
+        self.elements = ElementCache(driver) if cache_elements else None
+
+    def _emit(self, event: str, **fields) -> None:
+        if self.events is not None:
+            self.events.emit(event, **fields)
 
     def get(self, url: str) -> None:
-        logging.info(f"Navigating to {url}")
+        logging.info("Navigating to %s", url)
+        self._emit("navigate", url=url)
+        if self.elements is not None:
+            self.elements.clear()
         self.driver.get(url)
         self._check_http_like_errors()
         self._check_simple_js_errors()
@@ -132,31 +502,47 @@ class AutoHealingDriver:
 
         timeout = timeout or self.default_timeout
         self.metrics.locators_tried += 1
+        start_time = time.time()
+        requested = (by, value)
 
         # If we have a stored locator for this logical element, prefer that
         stored = self.store.get(name)
+        if stored is None:
+            # New instance of a known (possibly already healed) locator family
+            stored = self.store.from_family(by, value)
         using_memory_healing = False
         if stored:
             if stored.by != by or stored.value != value:
                 using_memory_healing = True
             by, value = stored.by, stored.value
-            logging.info(f"[{name}] Using stored locator: {by}={value}")
+            logging.info("[%s] Using stored locator: %s=%s", name, by, value)
         else:
-            logging.info(f"[{name}] Using initial locator: {by}={value}")
+            logging.info("[%s] Using initial locator: %s=%s", name, by, value)
+
+        # One round trip: a still-valid handle for the resolved locator, or the page's own match
+        element = None
+        if self.elements is not None:
+            element, reused = self.elements.lookup(by, value)
+            if reused:
+                logging.info("[%s] Reusing cached element for %s=%s", name, by, value)
+                self._emit_lookup(name, requested, by, value, bool(stored), "cached", start_time)
+                return element
 
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
+            if element is None:
+                element = WebDriverWait(self.driver, timeout).until(
+                    EC.presence_of_element_located((by, value))
+                )
             self._on_success(name, by, value, healed=stored.healed if stored else False, element=element)
             
             if using_memory_healing:
-                 logging.info(f"[{name}] healing successful")
-                 
+                 logging.info("[%s] healing successful", name)
+
+            self._emit_lookup(name, requested, by, value, bool(stored), "found", start_time)
             return element
 
         except (NoSuchElementException, TimeoutException, StaleElementReferenceException) as e:
-            logging.warning(f"[{name}] Primary locator failed: {by}={value} ({e.__class__.__name__})")
+            logging.warning("[%s] Primary locator failed: %s=%s (%s)", name, by, value, e.__class__.__name__)
             self.metrics.locators_failed += 1
 
             # (removed duplicate line self.metrics.locators_failed += 1)
@@ -165,23 +551,48 @@ class AutoHealingDriver:
 
             if healed_locator:
                 healed_by, healed_value, heal_reason = healed_locator
-                logging.info(f"[{name}] Healed locator: {healed_by}={healed_value} ({heal_reason})")
+                logging.info("[%s] Healed locator: %s=%s (%s)", name, healed_by, healed_value, heal_reason)
 
                 try:
                     element = WebDriverWait(self.driver, timeout).until(
                         EC.presence_of_element_located((healed_by, healed_value))
                     )
                     self._on_success(name, healed_by, healed_value, healed=True, heal_reason=heal_reason, element=element)
+                    self._emit_lookup(name, requested, healed_by, healed_value, bool(stored), "healed", start_time)
                     return element
                 except Exception as e2:
-                    logging.error(f"[{name}] Element not interactable even after healing: {e2}")
+                    logging.error("[%s] Element not interactable even after healing: %s", name, e2)
                     self.metrics.heals_failed += 1
+                    self._emit_lookup(name, requested, healed_by, healed_value, bool(stored), "failed", start_time)
                     raise
 
-            logging.error(f"[{name}] Could not heal locator.")
+            logging.error("[%s] Could not heal locator.", name)
             self.metrics.heals_failed += 1
+            self._emit_lookup(name, requested, by, value, bool(stored), "failed", start_time)
             raise
 
+    def _emit_lookup(
+        self,
+        name: str,
+        requested: Tuple[str, str],
+        by: str,
+        value: str,
+        stored: bool,
+        outcome: str,
+        start_time: float,
+    ) -> None:
+        self._emit(
+            "lookup",
+            name=name,
+            requested_by=requested[0],
+            requested_value=requested[1],
+            by=by,
+            value=value,
+            stored=stored,
+            outcome=outcome,
+            duration=time.time() - start_time,
+        )
+
 
     def _on_success(
         self,
@@ -208,7 +619,7 @@ class AutoHealingDriver:
                     if txt:
                         attributes["text"] = txt[:50] # Limit length
             except Exception as e:
-                logging.warning(f"[{name}] Failed to capture attributes: {e}")
+                logging.warning("[%s] Failed to capture attributes: %s", name, e)
 
         info = LocatorInfo(
             by=by,
@@ -227,10 +638,28 @@ class AutoHealingDriver:
         value: str,
         timeout: int,
     ) -> Optional[Tuple[str, str, str]]:
-        
         start_time = time.time()
-        heal_attempts = []
         self.metrics.heals_attempted += 1
+        healed, attempts = self._match_rules(name, by, value, timeout)
+        self._heal_done(name, "Standard", start_time, healed, "Attempts", attempts)
+        return healed
+
+    def _match_rules(
+        self,
+        name: str,
+        by: str,
+        value: str,
+        timeout: int,
+        deadline: Optional[float] = None,
+    ) -> Tuple[Optional[Tuple[str, str, str]], int]:
+        """
+        The rule-based match behind _heal_locator, without metrics or the
+        [Performance] line: the healed locator (or None) and the number of
+        candidate locators. CascadeDriver runs it as one of its stages and
+        passes a deadline (time.time() value); the attempts stop once it
+        has passed.
+        """
+        heal_attempts = []
 
         stored = self.store.get(name)
         if stored and (stored.by != by or stored.value != value):
@@ -256,10 +685,9 @@ class AutoHealingDriver:
             if "class" in attrs:
                 heal_attempts.append((By.CLASS_NAME, attrs["class"], f"Fallback to Class='{attrs['class']}'"))
                 
-            # 4. Text Fallback (XPath)
+            # 4. Text Fallback (page text index, resolved when reached)
             if "text" in attrs and "tag" in attrs:
-                xpath = f"//{attrs['tag']}[text()='{attrs['text']}']"
-                heal_attempts.append((By.XPATH, xpath, f"Fallback to Text='{attrs['text']}'"))
+                heal_attempts.append((TEXT_INDEX, attrs["text"], f"Fallback to Text='{attrs['text']}'"))
 
         # --- Standard Rules (ID->CSS, ID->XPath) ---
         if by == By.ID:
@@ -278,28 +706,126 @@ class AutoHealingDriver:
                 cls = value.replace(".", "")
                 heal_attempts.append((By.CLASS_NAME, cls, "CSS class->Class Name"))
 
+        # --- Compound CSS/XPath: drop ancestors, position/text, or all but the id ---
+        # A relaxed selector is looser than the original, so it only counts when unique
+        relaxed = []
+        if by in (By.CSS_SELECTOR, By.XPATH):
+            relaxed = self._relaxed_attempts(by, value)
+            heal_attempts.extend(relaxed)
+        unique_only = {(r_by, r_value) for r_by, r_value, _ in relaxed}
+
         for h_by, h_value, reason in heal_attempts:
-            logging.info(f"[{name}] Healing attempt: {h_by}={h_value} ({reason})")
+            if expired(deadline):
+                logging.info("[%s] Heal deadline passed; stopping rule attempts", name)
+                break
+            if h_by == TEXT_INDEX:
+                resolved = self._text_attempt(name, h_value, stored.attributes["tag"])
+                if resolved is None:
+                    continue
+                h_by, h_value, reason = resolved[0], resolved[1], f"{reason} ({resolved[2]})"
+            if (h_by, h_value) in unique_only and not self._matches_one(h_by, h_value):
+                logging.info("[%s] Skipping relaxed selector %s=%s: not unique", name, h_by, h_value)
+                continue
+            logging.info("[%s] Healing attempt: %s=%s (%s)", name, h_by, h_value, reason)
+            attempt_start = time.time()
             try:
                 WebDriverWait(self.driver, timeout).until(
                     EC.presence_of_element_located((h_by, h_value))
                 )
-                self.metrics.heals_successful += 1
-                logging.info(f"[{name}] healing successful")
-                
-                # Metrics: Performance Log
-                duration = time.time() - start_time
-                logging.info(f"[Performance] Method=Standard, Time={duration:.4f}s, Attempts={len(heal_attempts)}, Success=True")
-                
-                return h_by, h_value, reason
+                self._emit("heal_attempt", name=name, by=h_by, value=h_value, reason=reason,
+                           success=True, duration=time.time() - attempt_start)
+                return (h_by, h_value, reason), len(heal_attempts)
             except Exception:
+                self._emit("heal_attempt", name=name, by=h_by, value=h_value, reason=reason,
+                           success=False, duration=time.time() - attempt_start)
                 continue
-        
-        # Metrics: Performance Log (Failed)
+
+        return None, len(heal_attempts)
+
+    def _text_attempt(self, name: str, text: str, tag: str) -> Optional[Tuple[str, str, str]]:
+        """
+        Looks the stored text up in the page's text index and returns a
+        locator for the match: its id when it has one, otherwise an XPath on
+        its normalized text. None when nothing on the page matches.
+        """
+        if self._text_index is None:
+            self._text_index = TextIndex(self.driver)
+        try:
+            mode, elements = self._text_index.lookup(text, tag)
+        except Exception as e:
+            logging.warning("[%s] Text index lookup failed: %s", name, e)
+            return None
+        if not elements:
+            logging.info("[%s] No %s with text '%s' in the text index", name, tag, text)
+            return None
+        element = elements[0]
+        element_id = element.get_attribute("id")
+        if element_id:
+            return By.ID, element_id, mode
+        step = Step()
+        step.tag = tag
+        step.text = ("normalized", " ".join(element.text.split()))
+        return By.XPATH, format_locator(By.XPATH, (step,))[1], mode
+
+    def _relaxed_attempts(self, by: str, value: str) -> List[Tuple[str, str, str]]:
+        try:
+            steps = parse_locator(by, value)
+        except InvalidSelectorException:
+            return []
+        attempts = []
+        for relaxed, reason in relaxations(steps):
+            locator = format_locator(by, relaxed)
+            if locator and locator != (by, value):
+                attempts.append((locator[0], locator[1], f"Relaxed selector: {reason}"))
+        return attempts
+
+    def _matches_one(self, by: str, value: str) -> bool:
+        try:
+            return len(self.driver.find_elements(by, value)) == 1
+        except Exception:
+            return False
+
+    def _heal_done(
+        self,
+        name: str,
+        method: str,
+        start_time: float,
+        healed: Optional[Tuple[str, str, str]],
+        count_label: str,
+        count: int,
+    ) -> None:
+        """Counts a successful heal and writes the one [Performance] line per heal."""
+        if healed:
+            self.metrics.heals_successful += 1
+            logging.info("[%s] healing successful", name)
+        self._log_heal_result(name, method, start_time, bool(healed), count_label, count)
+
+    def _log_heal_result(
+        self,
+        name: str,
+        method: str,
+        start_time: float,
+        success: bool,
+        count_label: str,
+        count: int,
+    ) -> None:
+        """
+        Writes the [Performance] line analyze_accuracy.py parses and the
+        matching heal_result event.
+        """
         duration = time.time() - start_time
-        logging.info(f"[Performance] Method=Standard, Time={duration:.4f}s, Attempts={len(heal_attempts)}, Success=False")
-        
-        return None
+        logging.info(
+            "[Performance] Method=%s, Time=%.4fs, %s=%d, Success=%s",
+            method, duration, count_label, count, success,
+        )
+        self._emit(
+            "heal_result",
+            name=name,
+            method=method,
+            success=success,
+            duration=duration,
+            **{count_label.lower(): count},
+        )
 
 
  
@@ -314,7 +840,7 @@ class AutoHealingDriver:
         ]
         for ind in indicators:
             if ind in html:
-                logging.error(f"HTTP-like error detected: {ind}")
+                logging.error("HTTP-like error detected: %s", ind)
                 break
 
     def _check_simple_js_errors(self) -> None:
@@ -328,49 +854,24 @@ class AutoHealingDriver:
             level = entry.get("level", "").upper()
             message = entry.get("message", "")
             if "ERROR" in level:
-                logging.error(f"JS error: {message}")
-
-    def _update_metrics_from_log(self) -> None:
-        if not self.log_path or not os.path.exists(self.log_path):
-            logging.warning("No log path specified or file not found. Metrics will not be updated from logs.")
-            return
-            
-        try:
-            with open(self.log_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                
-            self.metrics.locators_tried = 0
-            self.metrics.locators_failed = 0
-            self.metrics.heals_attempted = 0
-            self.metrics.heals_successful = 0
-            self.metrics.heals_failed = 0
-            
-            for line in lines:
-                if "Using initial locator" in line or "Using stored locator" in line:
-                    self.metrics.locators_tried += 1
-                if "Primary locator failed" in line:
-                    self.metrics.locators_failed += 1
-                if "Healing attempt" in line:
-                    self.metrics.heals_attempted += 1
-                if "healing successful" in line:
-                    self.metrics.heals_successful += 1
-                if "Could not heal locator" in line:
-                    self.metrics.heals_failed += 1
-                    
-        except Exception as e:
-            logging.error(f"Failed to update metrics from log: {e}")
+                logging.error("JS error: %s", message)
 
     def _save_metrics(self) -> None:
         try:
             with open(self.metrics_path, "w", encoding="utf-8") as f:
-                json.dump(self.metrics.to_dict(), f, indent=2)
+                json.dump({"run_id": self.run_id, **self.metrics.to_dict()}, f, indent=2)
         except Exception as e:
             logging.error(f"Failed to save metrics: {e}")
 
     def quit(self) -> None:
-        self._update_metrics_from_log()
         self._save_metrics()
-        self.driver.quit()
+        self.history.record(self.run_id, self.metrics, self.started_at, time.time())
+        try:
+            self.driver.quit()
+        finally:
+            # Flush queued events even when the browser fails to close
+            if self.events is not None:
+                self.events.close()
 
     def __getattr__(self, item):
         return getattr(self.driver, item)
@@ -0,0 +1,120 @@
+"""
+Per-page WebElement handle cache for AutoHealingDriver.find().
+
+Entries are keyed by the resolved locator, the one find() is about to use
+after the LocatorStore and family lookups, so a store or family rewrite
+never hands back the element of the old locator.
+
+Every lookup is one script round trip that validates the cached handle
+against the page's mutation record (page_observer.py) and, when there is
+no valid handle, runs the query itself and reads the DOM version in the
+same call. A handle is reused while the page id is unchanged (no
+navigation), the element is attached and nothing in it mutated since the
+version it was found at. Ancestor changes that leave the element attached
+don't invalidate it.
+
+Only locators the page can resolve itself (id, name, class name, CSS,
+XPath, tag name) go through the cache; when the script finds nothing or
+fails (an open alert, a closed window), find() falls back to WebDriverWait
+and healing for that call. Only drivers that can't run JavaScript at all
+(dom.StaticDriver) disable the cache, on first use.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    UnknownMethodException,
+    WebDriverException,
+)
+
+from dom import ScriptsUnsupported
+from page_observer import INSTALL_OBSERVER
+
+# arguments: cached element (or null), its page id and version, query mode, query.
+# Returns [element or null, reused, page id, version the element is valid at].
+LOOKUP_SCRIPT = INSTALL_OBSERVER + """
+var el = arguments[0];
+if (el && state.id === arguments[1] && el.isConnected && (state.changed.get(el) || 0) <= arguments[2]) {
+  return [el, true, state.id, arguments[2]];
+}
+var found = null;
+try {
+  if (arguments[3] === 'xpath') {
+    found = document.evaluate(arguments[4], document, null,
+                              XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  } else {
+    found = document.querySelector(arguments[4]);
+  }
+} catch (e) {}
+return [found && found.nodeType === 1 ? found : null, false, state.id, state.version];
+"""
+
+_CLASS_NAME = re.compile(r"-?[A-Za-z_][\w-]*")
+
+
+def page_query(by: str, value: str) -> Optional[Tuple[str, str]]:
+    """(mode, query) for LOOKUP_SCRIPT, mirroring how WebDriver maps By strategies; None if unsupported."""
+    if by == By.XPATH:
+        return "xpath", value
+    if by in (By.CSS_SELECTOR, By.TAG_NAME):
+        return "css", value
+    if by in (By.ID, By.NAME):
+        quoted = value.replace("\\", "\\\\").replace('"', '\\"')
+        return "css", f'[{"id" if by == By.ID else "name"}="{quoted}"]'
+    if by == By.CLASS_NAME and _CLASS_NAME.fullmatch(value):
+        return "css", f".{value}"
+    return None
+
+
+class ElementCache:
+    def __init__(self, driver):
+        self.driver = driver
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], Tuple[Any, str, int]] = {}
+
+    def lookup(self, by: str, value: str) -> Tuple[Optional[Any], bool]:
+        """
+        (element, reused): the cached handle when it is still valid,
+        otherwise the page's own first match (cached for next time), or
+        (None, False) when nothing matched or the locator isn't supported.
+        """
+        query = page_query(by, value) if self.enabled else None
+        if query is None:
+            return None, False
+        key = (by, value)
+        element, page_id, version = self._entries.pop(key, (None, None, 0))
+        try:
+            try:
+                found, reused, page_id, version = self.driver.execute_script(
+                    LOOKUP_SCRIPT, element, page_id, version, *query)
+            except StaleElementReferenceException:
+                # The cached handle can't even be sent back to the page
+                found, reused, page_id, version = self.driver.execute_script(
+                    LOOKUP_SCRIPT, None, None, 0, *query)
+        except (ScriptsUnsupported, UnknownMethodException) as e:
+            logging.info("Element cache disabled: %s", e.__class__.__name__)
+            self.enabled = False
+            return None, False
+        except WebDriverException as e:
+            # Let find() run its own lookup and surface the error
+            logging.info("Element cache lookup failed: %s", e.__class__.__name__)
+            self.misses += 1
+            return None, False
+        if found is None:
+            self.misses += 1
+            return None, False
+        self._entries[key] = (found, page_id, version)
+        if reused:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found, reused
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,158 @@
+"""
+Asynchronous structured event logging.
+
+EventLogger takes typed events (lookup, heal_attempt, heal_result, ...) from
+the find hot path as plain tuples on a bounded queue and leaves JSON
+encoding, file I/O, size-based rotation and gzip to a background thread.
+emit() never blocks: when the queue is full the event is dropped and
+counted.
+
+The human-readable log (logs/auto_heal.log) is an optional sink: with
+text_sink=True the root logger's handlers are moved behind a QueueHandler
+so they also write from a background thread; with text_sink=False they are
+detached while the EventLogger is open.
+
+    events = EventLogger("logs/events.jsonl")
+    ah = AutoHealingDriver(driver, events=events)
+    ...
+    ah.quit()  # closes the browser, then flushes and closes the events
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import List, Optional, Any
+
+_STOP = object()
+
+
+class EventLogger:
+    def __init__(
+        self,
+        path: str = os.path.join("logs", "events.jsonl"),
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        text_sink: bool = True,
+        queue_size: int = 10000,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._thread = threading.Thread(target=self._run, name="autoheal-events", daemon=True)
+        self._thread.start()
+
+        self._root_handlers: List[logging.Handler] = []
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._route_text_log(text_sink)
+
+    # --- hot path ---
+
+    def emit(self, event: str, **fields: Any) -> None:
+        try:
+            self._queue.put_nowait((time.time(), event, fields))
+        except queue.Full:
+            self.dropped += 1
+
+    # --- lifecycle ---
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+        if self.dropped:
+            self.emit("logger_stats", dropped=self.dropped)
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+        self._restore_text_log()
+
+    def __enter__(self) -> "EventLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- background writer ---
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            lines = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                ts, event, fields = item
+                lines.append(json.dumps({"ts": ts, "event": event, **fields}, default=str))
+            if lines:
+                self._write("\n".join(lines) + "\n")
+            if stop:
+                return
+
+    def _write(self, data: str) -> None:
+        try:
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data.encode("utf-8"))
+            if self._size >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            logging.error(f"Failed to write events: {e}")
+
+    def _rotate(self) -> None:
+        """events.jsonl -> events.jsonl.1.gz, shifting older archives up to `backups`."""
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}.gz"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}.gz")
+        if self.backups > 0:
+            with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+    # --- human-readable sink ---
+
+    def _route_text_log(self, text_sink: bool) -> None:
+        root = logging.getLogger()
+        self._root_handlers = root.handlers[:]
+        for handler in self._root_handlers:
+            root.removeHandler(handler)
+        if text_sink and self._root_handlers:
+            text_queue: "queue.Queue[Any]" = queue.Queue(-1)
+            self._listener = logging.handlers.QueueListener(
+                text_queue, *self._root_handlers, respect_handler_level=True
+            )
+            self._listener.start()
+            root.addHandler(logging.handlers.QueueHandler(text_queue))
+        elif not text_sink:
+            root.addHandler(logging.NullHandler())
+
+    def _restore_text_log(self) -> None:
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+        for handler in self._root_handlers:
+            root.addHandler(handler)
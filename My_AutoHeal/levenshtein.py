@@ -7,7 +7,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.alert import Alert
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from driver import AutoHealingDriver, LocatorInfo
+from selenium.common.exceptions import InvalidSelectorException, WebDriverException
+from driver import AutoHealingDriver, LocatorInfo, expired
+from locator_steps import Step, format_locator, match_attr, parse_locator, relaxations
+from tracer import CommandTracer
+from recorder import SessionRecorder
+from events import EventLogger
 
 # --- ALGORITHM ---
 
@@ -34,6 +39,31 @@ def levenshtein_distance(s1: str, s2: str) -> int:
 
     return previous_row[-1]
 
+def similarity(s1: str, s2: str) -> float:
+    """1.0 for equal strings, 0.0 when every character differs."""
+    longest = max(len(s1), len(s2))
+    return 1.0 - levenshtein_distance(s1, s2) / longest if longest else 1.0
+
+# Minimum mean per-component similarity for a compound selector match
+COMPOUND_THRESHOLD = 0.6
+
+# Strategies healed by fuzzy-matching one attribute across the page
+ATTRIBUTES = {By.ID: "id", By.NAME: "name", By.CLASS_NAME: "class"}
+
+# A fuzzy probe matching more elements than this is too loose to score
+MAX_PROBE_MATCHES = 200
+
+# [[tag, {attribute: value}, visible text], ...] for arguments[0], reading
+# the attribute names in arguments[1]: one round trip per probe
+FEATURES_SCRIPT = """
+var names = arguments[1];
+return arguments[0].map(function (el) {
+  var attrs = {};
+  for (var i = 0; i < names.length; i++) attrs[names[i]] = el.getAttribute(names[i]);
+  return [el.tagName.toLowerCase(), attrs, el.innerText || ''];
+});
+"""
+
 # --- DRIVER OVERRIDE ---
 
 class LevenshteinDriver(AutoHealingDriver):
@@ -49,89 +79,270 @@ class LevenshteinDriver(AutoHealingDriver):
         value: str,
         timeout: int,
     ) -> Optional[Tuple[str, str, str]]:
-        
         start_time = time.time()
-        logging.info(f"[{name}] (Levenshtein) Healing attempt for {by}={value}")
+        logging.info("[%s] (Levenshtein) Healing attempt for %s=%s", name, by, value)
         self.metrics.heals_attempted += 1
-
-        # We primarily support ID/Class/Name matching for this demo
-        search_attribute = ""
-        if by == By.ID: 
-            search_attribute = "id"
-        elif by == By.NAME: 
-            search_attribute = "name"
-        elif by == By.CLASS_NAME: 
-            search_attribute = "class"
+        if by in ATTRIBUTES:
+            healed, scanned = self._match_attribute(name, by, value, timeout)
         else:
-            # Fallback: if we can't map 'by' to a simple attribute, we can't easily scan everything strings
-            # Metrics: Performance Log (Failed - Unsupported)
-            duration = time.time() - start_time
-            logging.info(f"[Performance] Method=Levenshtein, Time={duration:.4f}s, Scanned=0, Success=False")
-            return None
+            # Compound CSS/XPath: relax and fuzzy-match the parsed steps
+            healed, scanned = self._match_compound(name, by, value)
+        self._heal_done(name, "Levenshtein", start_time, healed, "Scanned", scanned)
+        return healed
 
+    def _match_attribute(
+        self,
+        name: str,
+        by: str,
+        value: str,
+        timeout: int,
+        deadline: Optional[float] = None,
+    ) -> Tuple[Optional[Tuple[str, str, str]], int]:
+        """
+        Closest id/name/class on the page by Levenshtein distance. Returns
+        the healed locator (or None) and the number of candidates scanned;
+        gives up without a match once `deadline` has passed.
+        """
         try:
             # Find all elements that possess this attribute
-            elements = self.driver.find_elements(By.CSS_SELECTOR, f"[{search_attribute}]")
-        except:
-             # Metrics: Performance Log (Failed - Exception)
-            duration = time.time() - start_time
-            logging.info(f"[Performance] Method=Levenshtein, Time={duration:.4f}s, Scanned=0, Success=False")
-            return None
+            candidates = self._candidates(ATTRIBUTES[by], deadline)
+        except Exception:
+            return None, 0
 
-        candidates_count = len(elements)
+        candidates_count = len(candidates)
         best_distance = float('inf')
         best_candidate: Optional[str] = None
 
-        for el in elements:
-            try:
-                attr_val = el.get_attribute(search_attribute)
-                if not attr_val: continue
-                
-                dist = levenshtein_distance(value, attr_val)
-                if dist < best_distance:
-                    best_distance = dist
-                    best_candidate = attr_val
-            except:
-                continue
+        for i, attr_val in enumerate(candidates):
+            if expired(deadline):
+                logging.info("[%s] Heal deadline passed after %d of %d candidates", name, i, candidates_count)
+                return None, i
+            dist = levenshtein_distance(value, attr_val)
+            if dist < best_distance:
+                best_distance = dist
+                best_candidate = attr_val
 
         # Threshold to avoid matching noise (e.g. login -> footer)
         # Distance > 70% of length is probably bad
         limit = max(2, len(value) * 0.7)
         
         if best_distance > limit:
-            logging.info(f"[{name}] Best match '{best_candidate}' (dist={best_distance}) was too weak.")
-            # Metrics: Performance Log (Failed - too weak)
-            duration = time.time() - start_time
-            logging.info(f"[Performance] Method=Levenshtein, Time={duration:.4f}s, Scanned={candidates_count}, Success=False")
-            return None
+            logging.info("[%s] Best match '%s' (dist=%s) was too weak.", name, best_candidate, best_distance)
+            return None, candidates_count
             
         if best_candidate and best_candidate != value:
-            logging.info(f"[{name}] Found Levenshtein match: '{best_candidate}' (dist={best_distance})")
+            logging.info("[%s] Found Levenshtein match: '%s' (dist=%s)", name, best_candidate, best_distance)
             
             # Verify if it works
             try:
                 WebDriverWait(self.driver, timeout).until(
                     EC.presence_of_element_located((by, best_candidate))
                 )
-                self.metrics.heals_successful += 1
-                logging.info(f"[{name}] healing successful")
-                
-                # Metrics: Performance Log (Success)
-                duration = time.time() - start_time
-                logging.info(f"[Performance] Method=Levenshtein, Time={duration:.4f}s, Scanned={candidates_count}, Success=True")
-                
-                return by, best_candidate, f"Levenshtein (dist={best_distance})"
-            except: 
-                # Metrics: Performance Log (Failed - Verification Failed)
-                duration = time.time() - start_time
-                logging.info(f"[Performance] Method=Levenshtein, Time={duration:.4f}s, Scanned={candidates_count}, Success=False")
+                return (by, best_candidate, f"Levenshtein (dist={best_distance})"), candidates_count
+            except Exception:
                 pass
-            
-        # Metrics: Performance Log (Failed - No suitable candidate or verification failed)
-        duration = time.time() - start_time
-        logging.info(f"[Performance] Method=Levenshtein, Time={duration:.4f}s, Scanned={candidates_count}, Success=False")
-            
-        return None
+
+        # No suitable candidate or verification failed
+        return None, candidates_count
+
+    def _candidates(self, attribute: str, deadline: Optional[float] = None) -> List[str]:
+        """Values of `attribute` on every element that has it (one DOM-wide scan)."""
+        values = []
+        for el in self.driver.find_elements(By.CSS_SELECTOR, f"[{attribute}]"):
+            if expired(deadline):
+                break
+            try:
+                attr_val = el.get_attribute(attribute)
+            except Exception:
+                continue
+            if attr_val:
+                values.append(attr_val)
+        return values
+
+    def _match_compound(
+        self,
+        name: str,
+        by: str,
+        value: str,
+        deadline: Optional[float] = None,
+    ) -> Tuple[Optional[Tuple[str, str, str]], int]:
+        """
+        Heals CSS/XPath without scanning the page: first the exact
+        relaxations of the parsed selector (accepted only when unique), then
+        one query per fuzzy level, scoring each candidate step by step from
+        one feature read per probe. The tag-only probe runs only inside the
+        original ancestors, and a probe matching more than
+        MAX_PROBE_MATCHES elements is skipped. Returns the healed locator
+        (or None) and the elements scanned; stops between queries once
+        `deadline` has passed.
+        """
+        try:
+            steps = parse_locator(by, value)
+        except InvalidSelectorException:
+            return None, 0
+
+        scanned = 0
+        for relaxed, reason in relaxations(steps):
+            if expired(deadline):
+                return None, scanned
+            locator = format_locator(by, relaxed)
+            if locator is None:
+                continue
+            found = self._query(*locator)
+            scanned += len(found)
+            if len(found) == 1:
+                return (locator[0], locator[1], f"Relaxed selector: {reason}"), scanned
+
+        ancestors, target = steps[:-1], steps[-1]
+        constrained = target.id is not None or target.classes or target.attrs or target.text is not None
+        for probe in self._fuzzy_probes(target) if constrained else []:
+            # Within the original ancestors first, then anywhere on the page
+            for scope in ((ancestors, ()) if ancestors else ((),)):
+                if expired(deadline):
+                    logging.info("[%s] Heal deadline passed; stopping selector probes", name)
+                    return None, scanned
+                if not scope and not probe.attrs:
+                    continue  # a bare tag page-wide is a document scan
+                locator = format_locator(by, scope + (probe,))
+                if locator is None:
+                    continue
+                found = self._query(*locator)
+                scanned += len(found)
+                if len(found) > MAX_PROBE_MATCHES:
+                    logging.info("[%s] Probe %s=%s matched %d elements; too loose to score", name, locator[0], locator[1], len(found))
+                    continue
+                features = self._features(found, target, deadline)
+                if expired(deadline):
+                    return None, scanned
+                ranked = sorted(
+                    ((self._score_step(f, target), el, f) for el, f in zip(found, features) if f),
+                    key=lambda r: r[0], reverse=True,
+                )
+                if not ranked or ranked[0][0] < COMPOUND_THRESHOLD:
+                    continue
+                if len(ranked) > 1 and ranked[1][0] == ranked[0][0]:
+                    logging.info("[%s] %d candidates tie at score %.2f; not guessing", name, len(ranked), ranked[0][0])
+                    continue
+                best_score, best, best_features = ranked[0]
+                healed = self._locator_for(by, best, best_features, target)
+                if healed:
+                    logging.info("[%s] Found Levenshtein selector match: %s=%s (score=%.2f)", name, healed[0], healed[1], best_score)
+                    return (healed[0], healed[1], f"Levenshtein selector (score={best_score:.2f})"), scanned
+
+        logging.info("[%s] No selector relaxation matched %s=%s", name, by, value)
+        return None, scanned
+
+    def _query(self, by: str, value: str) -> list:
+        try:
+            return self.driver.find_elements(by, value)
+        except Exception:
+            return []
+
+    @staticmethod
+    def _fuzzy_probes(target: Step) -> List[Step]:
+        """
+        Progressively looser single-step queries: tag plus the step's
+        anchoring attribute, the attribute alone (tag changed), the tag
+        alone (attribute renamed; only used inside the step's ancestors).
+        A step with neither is not probed, so the whole document is never
+        scanned.
+        """
+        key = "id" if target.id is not None else (target.attrs[0][0] if target.attrs else
+                                                   ("class" if target.classes else None))
+        probes = []
+        for tag, attr in ((target.tag, key), (None, key), (target.tag, None)):
+            if tag is None and attr is None:
+                continue
+            probe = Step()
+            probe.tag = tag
+            if attr:
+                probe.attrs.append((attr, "exists", None))
+            if not any(p.tag == probe.tag and p.attrs == probe.attrs for p in probes):
+                probes.append(probe)
+        return probes
+
+    def _features(self, elements: list, target: Step,
+                  deadline: Optional[float] = None) -> List[Optional[Tuple[str, Dict[str, Optional[str]], str]]]:
+        """
+        (tag, attributes, text) of every element, reading the id, class and
+        the step's attributes: one script round trip, or per-element calls
+        on drivers without JavaScript. None for elements that went stale.
+        """
+        names = ["id", "class"] + [attr for attr, _, _ in target.attrs if attr not in ("id", "class")]
+        if not elements:
+            return []
+        try:
+            return [(tag, attrs, text) for tag, attrs, text in
+                    self.driver.execute_script(FEATURES_SCRIPT, elements, names)]
+        except WebDriverException:
+            pass
+        features = []
+        for el in elements:
+            if expired(deadline):
+                break
+            try:
+                features.append((
+                    el.tag_name.lower(),
+                    {attr: el.get_attribute(attr) for attr in names},
+                    (el.text or "") if target.text is not None else "",
+                ))
+            except Exception:
+                features.append(None)
+        return features
+
+    @staticmethod
+    def _score_step(features: Tuple[str, Dict[str, Optional[str]], str], target: Step) -> float:
+        """Mean similarity of the element's features to each constraint of the step."""
+        tag, attrs, text = features
+        scores = []
+        if target.tag is not None:
+            scores.append(1.0 if tag == target.tag else 0.0)
+        if target.id is not None:
+            scores.append(similarity(target.id, attrs.get("id") or ""))
+        if target.classes:
+            actual = (attrs.get("class") or "").split()
+            for cls in target.classes:
+                scores.append(max((similarity(cls, c) for c in actual), default=0.0))
+        for attr, op, expected in target.attrs:
+            actual_value = attrs.get(attr)
+            if actual_value is None:
+                scores.append(0.0)
+            elif match_attr(actual_value, op, expected):
+                scores.append(1.0)
+            else:
+                scores.append(similarity(expected or "", actual_value))
+        if target.text is not None:
+            mode, expected = target.text
+            text = " ".join(text.split())
+            scores.append(1.0 if mode.startswith("contains") and expected in text else similarity(expected, text))
+        return sum(scores) / len(scores) if scores else 0.0
+
+    def _locator_for(self, by: str, el, features: Tuple[str, Dict[str, Optional[str]], str],
+                     target: Step) -> Optional[Tuple[str, str]]:
+        """An exact locator for `el` shaped like the target step, verified to resolve to it."""
+        tag, attrs, text = features
+        step = Step()
+        if attrs.get("id"):
+            step.id = attrs["id"]
+        else:
+            step.tag = tag
+            actual = (attrs.get("class") or "").split()
+            for cls in target.classes:
+                best = max(actual, key=lambda c: similarity(cls, c), default=None)
+                if best and best not in step.classes:
+                    step.classes.append(best)
+            for attr, _, _ in target.attrs:
+                if attrs.get(attr) is not None:
+                    step.attrs.append((attr, "=", attrs[attr]))
+            if target.text is not None:
+                text = " ".join(text.split())
+                if text:
+                    step.text = ("normalized", text)
+        locator = format_locator(by, (step,))
+        if locator is None:
+            return None
+        found = self._query(*locator)
+        return locator if found and found[0] == el else None
 
 # --- SCENARIO FUNCTIONS ---
 
@@ -208,10 +419,20 @@ def main():
     )
 
     driver = webdriver.Chrome()
-    ah = LevenshteinDriver(driver, locator_store_path="locator_store_levenshtein.json", metrics_path="metrics_levenshtein.json", log_path="logs/levenshtein.log")
+    # Opt-in: AUTOHEAL_EVENTS=logs/events.jsonl writes typed JSONL events from a background thread
+    events_path = os.environ.get("AUTOHEAL_EVENTS")
+    events = EventLogger(events_path) if events_path else None
+    ah = LevenshteinDriver(driver, locator_store_path="locator_store_levenshtein.json", metrics_path="metrics_levenshtein.json", log_path="logs/levenshtein.log", events=events)
+
+    # Opt-in: AUTOHEAL_TRACE=logs/trace records every WebDriver command per find
+    trace_prefix = os.environ.get("AUTOHEAL_TRACE")
+    tracer = CommandTracer().attach(ah) if trace_prefix else None
+    # Opt-in: AUTOHEAL_RECORD=recordings captures lookups + DOM snapshots for replay.py
+    record_dir = os.environ.get("AUTOHEAL_RECORD")
+    recorder = SessionRecorder(record_dir).attach(ah) if record_dir else None
     
     # NO MEMORY SEEDING -> Forces Levenshtein Healing
-    ah.store._data = {}
+    ah.store.clear()
     
     try:
         run_login_scenario(ah)
@@ -226,6 +447,11 @@ def main():
         traceback.print_exc()
     finally:
         ah.quit()
+        if tracer:
+            tracer.print_summary()
+            tracer.write(trace_prefix)
+        if recorder:
+            recorder.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,385 @@
+"""
+Selector decomposition shared by StaticDriver and the healers.
+
+CSS selectors and XPath expressions are parsed into a chain of Steps (tag,
+id, classes, attribute predicates, text, position) joined by descendant or
+child axes. parse_locator() caches the parsed form per (by, value), so a
+locator that fails on every page is only parsed once per process. The
+healers relax Steps instead of strings and turn the result back into a
+locator with format_locator().
+
+Supported: tag, #id, .class, [attr], [attr op value] (=, ~=, ^=, $=, *=,
+|=), descendant and '>' combinators; XPath steps with '/' or '//' and
+predicates @a='v', @a, contains(@a, ..), starts-with(@a, ..), text()=..,
+contains(text(), ..), normalize-space()=.., .=.., contains(., ..), [n]
+and 'and'. Anything else raises InvalidSelectorException.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import InvalidSelectorException
+
+
+class Step:
+    """
+    One step of a CSS compound selector or XPath location path.
+    axis is 'descendant' or 'child' relative to the previous step.
+    """
+
+    __slots__ = ("axis", "tag", "id", "classes", "attrs", "text", "position")
+
+    def __init__(self, axis: str = "descendant"):
+        self.axis = axis
+        self.tag: Optional[str] = None
+        self.id: Optional[str] = None
+        self.classes: List[str] = []
+        self.attrs: List[Tuple[str, str, Optional[str]]] = []  # (name, op, value)
+        self.text: Optional[Tuple[str, str]] = None  # (mode, value)
+        self.position: Optional[int] = None
+
+    def copy(self, axis: Optional[str] = None) -> "Step":
+        step = Step(self.axis if axis is None else axis)
+        step.tag = self.tag
+        step.id = self.id
+        step.classes = list(self.classes)
+        step.attrs = list(self.attrs)
+        step.text = self.text
+        step.position = self.position
+        return step
+
+
+def match_attr(actual: str, op: str, expected: Optional[str]) -> bool:
+    """CSS/XPath attribute operator semantics; op is one Step.attrs op."""
+    if op == "exists":
+        return True
+    if op == "=":
+        return actual == expected
+    if op == "~=":
+        return expected in actual.split()
+    if op == "^=":
+        return bool(expected) and actual.startswith(expected)
+    if op == "$=":
+        return bool(expected) and actual.endswith(expected)
+    if op == "*=":
+        return bool(expected) and expected in actual
+    if op == "|=":
+        return actual == expected or actual.startswith(f"{expected}-")
+    return False
+
+
+_IDENT = r"-?[_a-zA-Z][\w-]*"
+_CSS_PART = re.compile(
+    r"#(?P<id>" + _IDENT + r")"
+    r"|\.(?P<cls>" + _IDENT + r")"
+    r"|\[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+)))?\s*\]"
+)
+_CSS_TAG = re.compile(r"\*|[a-zA-Z][\w-]*")
+
+
+def _split_css(selector: str) -> List[str]:
+    """Split on descendant/child combinators outside [...] and quotes."""
+    tokens: List[str] = []
+    current, bracket, quote = "", False, None
+    for ch in selector.strip():
+        if quote:
+            current += ch
+            if ch == quote:
+                quote = None
+        elif bracket:
+            current += ch
+            if ch in "'\"":
+                quote = ch
+            elif ch == "]":
+                bracket = False
+        elif ch == "[":
+            current += ch
+            bracket = True
+        elif ch.isspace() or ch == ">":
+            if current:
+                tokens.append(current)
+                current = ""
+            if ch == ">":
+                tokens.append(">")
+        else:
+            current += ch
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+def parse_css(selector: str) -> List[Step]:
+    steps: List[Step] = []
+    axis = "descendant"
+    for token in _split_css(selector):
+        if token == ">":
+            if not steps or axis == "child":
+                raise InvalidSelectorException(f"Invalid CSS selector: {selector}")
+            axis = "child"
+            continue
+        steps.append(_parse_compound(token, axis, selector))
+        axis = "descendant"
+    if not steps or axis == "child":
+        raise InvalidSelectorException(f"Invalid CSS selector: {selector}")
+    return steps
+
+
+def _parse_compound(token: str, axis: str, selector: str) -> Step:
+    step = Step(axis)
+    pos = 0
+    m = _CSS_TAG.match(token)
+    if m:
+        if m.group(0) != "*":
+            step.tag = m.group(0).lower()
+        pos = m.end()
+    while pos < len(token):
+        m = _CSS_PART.match(token, pos)
+        if not m:
+            raise InvalidSelectorException(f"Unsupported CSS selector: {selector}")
+        if m.group("id"):
+            step.id = m.group("id")
+        elif m.group("cls"):
+            step.classes.append(m.group("cls"))
+        else:
+            value = next((v for v in (m.group("dq"), m.group("sq"), m.group("bare")) if v is not None), None)
+            step.attrs.append((m.group("attr"), m.group("op") or "exists", value))
+        pos = m.end()
+    return step
+
+
+_XPATH_STEP = re.compile(r"(//|/)([^/\[]+)((?:\[(?:[^\]'\"]|'[^']*'|\"[^\"]*\")*\])*)")
+_PREDICATE = re.compile(r"\[((?:[^\]'\"]|'[^']*'|\"[^\"]*\")*)\]")
+_QUOTED = r"(?:'([^']*)'|\"([^\"]*)\")"
+_XPATH_ATOMS = [
+    (re.compile(r"^@([\w-]+)\s*=\s*" + _QUOTED + r"$"), "attr"),
+    (re.compile(r"^@([\w-]+)$"), "attr-exists"),
+    (re.compile(r"^contains\(\s*@([\w-]+)\s*,\s*" + _QUOTED + r"\s*\)$"), "attr-contains"),
+    (re.compile(r"^starts-with\(\s*@([\w-]+)\s*,\s*" + _QUOTED + r"\s*\)$"), "attr-starts"),
+    (re.compile(r"^text\(\)\s*=\s*" + _QUOTED + r"$"), "text"),
+    (re.compile(r"^contains\(\s*text\(\)\s*,\s*" + _QUOTED + r"\s*\)$"), "contains-text"),
+    (re.compile(r"^normalize-space\(\s*(?:\.|text\(\))?\s*\)\s*=\s*" + _QUOTED + r"$"), "normalized"),
+    (re.compile(r"^\.\s*=\s*" + _QUOTED + r"$"), "normalized"),
+    (re.compile(r"^contains\(\s*(?:\.|normalize-space\(\s*\.?\s*\))\s*,\s*" + _QUOTED + r"\s*\)$"), "contains"),
+    (re.compile(r"^(\d+)$"), "position"),
+]
+
+
+def _split_and(expr: str) -> List[str]:
+    parts, depth, quote, start = [], 0, None, 0
+    i = 0
+    while i < len(expr):
+        ch = expr[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif depth == 0 and expr.startswith(" and ", i):
+            parts.append(expr[start:i])
+            start = i + 5
+            i += 4
+        i += 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts]
+
+
+def parse_xpath(xpath: str) -> List[Step]:
+    expr = xpath.strip()
+    if expr.startswith("("):
+        raise InvalidSelectorException(f"Unsupported XPath: {xpath}")
+    if not expr.startswith("/"):
+        expr = "//" + expr
+    steps: List[Step] = []
+    pos = 0
+    while pos < len(expr):
+        m = _XPATH_STEP.match(expr, pos)
+        if not m:
+            raise InvalidSelectorException(f"Unsupported XPath: {xpath}")
+        step = Step("descendant" if m.group(1) == "//" else "child")
+        name = m.group(2).strip()
+        if name != "*":
+            if not re.fullmatch(r"[a-zA-Z][\w-]*", name):
+                raise InvalidSelectorException(f"Unsupported XPath: {xpath}")
+            step.tag = name.lower()
+        for pred in _PREDICATE.findall(m.group(3)):
+            for atom in _split_and(pred):
+                _apply_xpath_atom(step, atom, xpath)
+        steps.append(step)
+        pos = m.end()
+    if not steps:
+        raise InvalidSelectorException(f"Invalid XPath: {xpath}")
+    return steps
+
+
+def _apply_xpath_atom(step: Step, atom: str, xpath: str) -> None:
+    for pattern, kind in _XPATH_ATOMS:
+        m = pattern.match(atom)
+        if not m:
+            continue
+        groups = m.groups()
+        quoted = next((g for g in groups[1:] if g is not None), None) if len(groups) > 1 else None
+        if kind == "attr":
+            if groups[0] == "id":
+                step.id = quoted
+            else:
+                step.attrs.append((groups[0], "=", quoted))
+        elif kind == "attr-exists":
+            step.attrs.append((groups[0], "exists", None))
+        elif kind == "attr-contains":
+            step.attrs.append((groups[0], "*=", quoted))
+        elif kind == "attr-starts":
+            step.attrs.append((groups[0], "^=", quoted))
+        elif kind == "position":
+            step.position = int(groups[0])
+        else:
+            step.text = (kind, next(g for g in groups if g is not None))
+        return
+    raise InvalidSelectorException(f"Unsupported XPath predicate '{atom}' in {xpath}")
+
+
+@lru_cache(maxsize=4096)
+def parse_locator(by: str, value: str) -> Tuple[Step, ...]:
+    """
+    Parsed form of any locator the healers handle. The Steps are shared
+    through the cache: copy them before changing anything.
+    """
+    if by == By.CSS_SELECTOR:
+        return tuple(parse_css(value))
+    if by == By.XPATH:
+        return tuple(parse_xpath(value))
+    step = Step()
+    if by == By.ID:
+        step.id = value
+    elif by == By.NAME:
+        step.attrs.append(("name", "=", value))
+    elif by == By.CLASS_NAME:
+        step.classes.append(value)
+    elif by == By.TAG_NAME:
+        step.tag = value.lower()
+    else:
+        raise InvalidSelectorException(f"Unsupported locator strategy: {by}")
+    return (step,)
+
+
+# --- back to locators ---
+
+_CSS_OPS = {"=", "~=", "^=", "$=", "*=", "|="}
+
+
+def to_css(steps: Tuple[Step, ...]) -> Optional[str]:
+    """CSS for the steps, or None when they use text or position predicates."""
+    parts = []
+    for i, step in enumerate(steps):
+        if step.text is not None or step.position is not None:
+            return None
+        if i and step.axis == "child":
+            parts.append(">")
+        token = step.tag or ""
+        if step.id is not None:
+            token += f"#{step.id}"
+        token += "".join(f".{c}" for c in step.classes)
+        for name, op, expected in step.attrs:
+            if op == "exists":
+                token += f"[{name}]"
+            elif op in _CSS_OPS:
+                token += f"[{name}{op}{_quote(expected or '', css=True)}]"
+            else:
+                return None
+        parts.append(token or "*")
+    return " ".join(parts)
+
+
+def to_xpath(steps: Tuple[Step, ...]) -> Optional[str]:
+    """
+    XPath for the steps, or None for CSS operators without a simple XPath
+    form. Classes become contains(@class, ..), which may also match longer
+    class names.
+    """
+    out = ""
+    for step in steps:
+        out += "/" if step.axis == "child" else "//"
+        out += step.tag or "*"
+        predicates = []
+        if step.id is not None:
+            predicates.append(f"@id={_quote(step.id)}")
+        for cls in step.classes:
+            predicates.append(f"contains(@class, {_quote(cls)})")
+        for name, op, expected in step.attrs:
+            if op == "exists":
+                predicates.append(f"@{name}")
+            elif op == "=":
+                predicates.append(f"@{name}={_quote(expected or '')}")
+            elif op == "*=":
+                predicates.append(f"contains(@{name}, {_quote(expected or '')})")
+            elif op == "^=":
+                predicates.append(f"starts-with(@{name}, {_quote(expected or '')})")
+            else:
+                return None
+        if step.text is not None:
+            mode, expected = step.text
+            predicates.append({
+                "text": "text()={}",
+                "contains-text": "contains(text(), {})",
+                "normalized": "normalize-space()={}",
+                "contains": "contains(., {})",
+            }[mode].format(_quote(expected)))
+        if predicates:
+            out += "[" + " and ".join(predicates) + "]"
+        if step.position is not None:
+            out += f"[{step.position}]"
+    return out
+
+
+def format_locator(by: str, steps: Tuple[Step, ...]) -> Optional[Tuple[str, str]]:
+    """Locator for the steps, in the caller's strategy when it can express them."""
+    if by != By.XPATH:
+        css = to_css(steps)
+        if css is not None:
+            return By.CSS_SELECTOR, css
+    xpath = to_xpath(steps)
+    return (By.XPATH, xpath) if xpath is not None else None
+
+
+def _quote(value: str, css: bool = False) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    if css:
+        return "'" + value.replace("'", "\\'") + "'"
+    return "concat(" + ", \"'\", ".join(f"'{p}'" for p in value.split("'")) + ")"
+
+
+# --- relaxation ---
+
+def relaxations(steps: Tuple[Step, ...]) -> Iterator[Tuple[Tuple[Step, ...], str]]:
+    """
+    Exact relaxations of a parsed locator, loosest last. Each one is a
+    single query; the fuzzy healers take over when none of them match.
+    Nothing is relaxed down to a bare tag outside its ancestors, which
+    would match anything.
+    """
+    ancestors, target = steps[:-1], steps[-1]
+    anchored = target.id is not None or bool(target.classes or target.attrs)
+    predicates = anchored or target.text is not None or target.position is not None
+    if ancestors and target.tag and predicates:
+        scoped = Step(target.axis)
+        scoped.tag = target.tag
+        yield ancestors + (scoped,), "keep ancestors, drop target predicates"
+    if ancestors and predicates:
+        yield (target.copy(axis="descendant"),), "drop ancestors"
+    if anchored and (target.position is not None or target.text is not None):
+        loose = target.copy(axis="descendant")
+        loose.position = None
+        loose.text = None
+        yield (loose,), "drop position/text"
+    if target.id is not None and (target.tag or target.classes or target.attrs or target.text or ancestors):
+        only_id = Step()
+        only_id.id = target.id
+        yield (only_id,), "id only"
@@ -0,0 +1,306 @@
+"""
+Streaming, incremental log analytics across our logs and Healenium's.
+
+Covers what analyze_accuracy.py ([Performance] lines), get_accuracy_report.py
+(healing successful / could not heal) and Healenium_test/analysis/
+healing_metrics.R (heal.success=true|false) each parse separately, plus
+Healenium backend startup times. Every line is matched once against a
+single compiled pattern; plain and .gz files are streamed, one file per
+worker process.
+
+Reruns are incremental: per-file byte offsets (plain logs) or size/mtime
+(rotated .gz archives) are kept in <state-dir>/state.json, latency samples
+are appended to per-file CSV columns in <state-dir>, so only new lines are
+parsed. NumPy is used for percentiles when installed.
+
+Usage:
+  python log_analytics.py                      # default log locations
+  python log_analytics.py logs/*.log ../Healenium_test/logs/* --workers 4
+  python log_analytics.py --summary analytics_summary.csv --full
+"""
+
+import argparse
+import csv
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python percentiles are used instead
+    np = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCES = [
+    os.path.join(BASE_DIR, "logs", "*.log"),
+    os.path.join(BASE_DIR, "..", "logs", "healenium-backend.log*"),
+    os.path.join(BASE_DIR, "..", "Healenium_test", "logs", "healenium-backend.log*"),
+    os.path.join(BASE_DIR, "..", "Healenium_test", "runs", "*.log"),
+]
+DEFAULT_STATE_DIR = os.path.join(BASE_DIR, "logs", ".analytics")
+
+LINE_PATTERN = re.compile(
+    rb"\[Performance\] Method=(?P<method>\w+), Time=(?P<time>[\d.]+)s, "
+    rb"(?P<label>Attempts|Scanned)=(?P<count>\d+), Success=(?P<success>True|False)"
+    rb"|(?P<healed>healing successful)"
+    rb"|(?P<unhealed>could not heal locator)"
+    rb"|heal\.success=(?P<hlm_success>true|false)"
+    rb"|Started Application in (?P<startup>[\d.]+) seconds",
+    re.IGNORECASE,
+)
+
+COUNTERS = ["heals_successful", "heals_failed", "hlm_heals", "hlm_failures", "lines"]
+SAMPLE_COLUMNS = ["kind", "method", "seconds", "count", "success"]
+
+
+def _open(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def scan_file(path: str, offset: int) -> Tuple[int, Dict[str, int], List[Tuple[str, str, float, int, int]]]:
+    """
+    Parse `path` from byte `offset` (ignored for .gz). Returns the offset of
+    the end of the last complete line, counters and latency samples.
+    """
+    counts = dict.fromkeys(COUNTERS, 0)
+    samples: List[Tuple[str, str, float, int, int]] = []
+    search = LINE_PATTERN.search
+    position = offset
+    with _open(path) as f:
+        if offset and not path.endswith(".gz"):
+            f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # partial line still being written; pick it up next run
+            position += len(line)
+            counts["lines"] += 1
+            m = search(line)
+            if not m:
+                continue
+            if m.group("method"):
+                samples.append((
+                    "heal",
+                    m.group("method").decode(),
+                    float(m.group("time")),
+                    int(m.group("count")),
+                    int(m.group("success").lower() == b"true"),
+                ))
+            elif m.group("healed"):
+                counts["heals_successful"] += 1
+            elif m.group("unhealed"):
+                counts["heals_failed"] += 1
+            elif m.group("hlm_success"):
+                counts["hlm_heals" if m.group("hlm_success").lower() == b"true" else "hlm_failures"] += 1
+            elif m.group("startup"):
+                samples.append(("startup", "Healenium", float(m.group("startup")), 0, 1))
+    return position, counts, samples
+
+
+# --- incremental state ---
+
+class AnalyticsState:
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, "state.json")
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.files = json.load(f)
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.files, f, indent=2)
+
+    def samples_path(self, path: str) -> str:
+        digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.state_dir, f"{os.path.basename(path)}.{digest}.csv")
+
+    def plan(self, path: str) -> Optional[int]:
+        """Offset to resume from, or None when the file is unchanged."""
+        st = os.stat(path)
+        entry = self.files.get(path)
+        if entry and entry["inode"] == st.st_ino:
+            if path.endswith(".gz"):
+                if entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+                    return None
+            elif st.st_size >= entry["offset"]:
+                return None if st.st_size == entry["offset"] else entry["offset"]
+        # New, rotated or truncated file: start over
+        self.reset(path)
+        return 0
+
+    def reset(self, path: str) -> None:
+        self.files.pop(path, None)
+        samples = self.samples_path(path)
+        if os.path.exists(samples):
+            os.remove(samples)
+
+    def update(self, path: str, offset: int, counts: Dict[str, int],
+               samples: List[Tuple[str, str, float, int, int]]) -> None:
+        st = os.stat(path)
+        entry = self.files.setdefault(path, {"counts": dict.fromkeys(COUNTERS, 0)})
+        entry.update(inode=st.st_ino, size=st.st_size, mtime=st.st_mtime, offset=offset)
+        for key, value in counts.items():
+            entry["counts"][key] = entry["counts"].get(key, 0) + value
+        if samples:
+            samples_path = self.samples_path(path)
+            new_file = not os.path.exists(samples_path)
+            with open(samples_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(SAMPLE_COLUMNS)
+                writer.writerows(samples)
+
+    def load_columns(self, paths: List[str]) -> Dict[str, List[Any]]:
+        columns: Dict[str, List[Any]] = {c: [] for c in SAMPLE_COLUMNS}
+        for path in paths:
+            samples_path = self.samples_path(path)
+            if not os.path.exists(samples_path):
+                continue
+            with open(samples_path, "r", newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    columns["kind"].append(row["kind"])
+                    columns["method"].append(row["method"])
+                    columns["seconds"].append(float(row["seconds"]))
+                    columns["count"].append(int(row["count"]))
+                    columns["success"].append(int(row["success"]))
+        return columns
+
+
+# --- aggregation ---
+
+PERCENTILES = [50, 90, 95, 99]
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    if np is not None:
+        return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(np.asarray(values), PERCENTILES))}
+    if len(values) == 1:
+        return {f"p{p}": values[0] for p in PERCENTILES}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+
+
+def aggregate(columns: Dict[str, List[Any]], counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, (kind, method) in enumerate(zip(columns["kind"], columns["method"])):
+        groups.setdefault((kind, method), []).append(i)
+
+    rows = []
+    for (kind, method), idx in sorted(groups.items()):
+        seconds = [columns["seconds"][i] for i in idx]
+        successes = sum(columns["success"][i] for i in idx)
+        rows.append({
+            "kind": kind,
+            "method": method,
+            "n": len(idx),
+            "success_rate": successes / len(idx),
+            "mean_count": statistics.fmean(columns["count"][i] for i in idx),
+            "mean_s": statistics.fmean(seconds),
+            **{f"{k}_s": v for k, v in _percentiles(seconds).items()},
+        })
+    total = counts["heals_successful"] + counts["heals_failed"]
+    rows.append({"kind": "accuracy", "method": "AutoHeal", "n": total,
+                 "success_rate": counts["heals_successful"] / total if total else 0.0})
+    hlm_total = counts["hlm_heals"] + counts["hlm_failures"]
+    rows.append({"kind": "accuracy", "method": "Healenium", "n": hlm_total,
+                 "success_rate": counts["hlm_heals"] / hlm_total if hlm_total else 0.0})
+    return rows
+
+
+def analyze(paths: List[str], state_dir: str = DEFAULT_STATE_DIR, workers: int = os.cpu_count() or 1,
+            full: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    state = AnalyticsState(state_dir)
+    if full:
+        for path in list(state.files):
+            state.reset(path)
+
+    jobs = [(path, offset) for path in paths if (offset := state.plan(path)) is not None]
+    if jobs:
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                results = list(pool.map(scan_file, *zip(*jobs)))
+        else:
+            results = [scan_file(path, offset) for path, offset in jobs]
+        for (path, _), (offset, counts, samples) in zip(jobs, results):
+            state.update(path, offset, counts, samples)
+        state.save()
+
+    counts = dict.fromkeys(COUNTERS, 0)
+    for path in paths:
+        for key, value in state.files.get(path, {}).get("counts", {}).items():
+            counts[key] += value
+    counts["files_parsed"] = len(jobs)
+    return aggregate(state.load_columns(paths), counts), counts
+
+
+def expand(patterns: List[str]) -> List[str]:
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)))
+    seen = set()
+    unique = []
+    for p in paths:
+        real = os.path.realpath(p)
+        if real not in seen and os.path.isfile(p):
+            seen.add(real)
+            unique.append(real)
+    return unique
+
+
+def print_summary(rows: List[Dict[str, Any]], counts: Dict[str, int], n_files: int) -> None:
+    print("\n" + "=" * 50)
+    print("          AUTO-HEAL / HEALENIUM LOG ANALYTICS          ")
+    print("=" * 50)
+    print(f"  Files: {n_files} ({counts['files_parsed']} parsed this run), lines: {counts['lines']}")
+    for row in rows:
+        if row["kind"] == "accuracy":
+            print(f"\n[ {row['method'].upper()} ACCURACY ]")
+            print(f"  Total: {row['n']}, Success Rate: {row['success_rate'] * 100:.1f}%")
+            continue
+        label = "HEALING LATENCY" if row["kind"] == "heal" else "STARTUP TIME"
+        print(f"\n[ {row['method'].upper()} {label} ]")
+        print(f"  Samples: {row['n']}, Success Rate: {row['success_rate'] * 100:.1f}%")
+        print(f"  Mean: {row['mean_s']:.4f}s  p50: {row['p50_s']:.4f}s  p90: {row['p90_s']:.4f}s  "
+              f"p95: {row['p95_s']:.4f}s  p99: {row['p99_s']:.4f}s")
+        if row["kind"] == "heal":
+            print(f"  Avg Attempts/Scanned: {row['mean_count']:.1f}")
+    print("\n" + "=" * 50 + "\n")
+
+
+def write_summary_csv(path: str, rows: List[Dict[str, Any]]) -> None:
+    columns = ["kind", "method", "n", "success_rate", "mean_count", "mean_s"] + [f"p{p}_s" for p in PERCENTILES]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Streaming analytics over Auto-Heal and Healenium logs")
+    parser.add_argument("paths", nargs="*", help="files or glob patterns (default: known log locations)")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--full", action="store_true", help="ignore saved offsets and reparse everything")
+    parser.add_argument("--summary", help="write the columnar summary as CSV")
+    args = parser.parse_args(argv)
+
+    paths = expand(args.paths or DEFAULT_SOURCES)
+    rows, counts = analyze(paths, args.state_dir, args.workers, args.full)
+    print_summary(rows, counts, len(paths))
+    if args.summary:
+        write_summary_csv(args.summary, rows)
+        print(f"Summary written to {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
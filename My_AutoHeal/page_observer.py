@@ -0,0 +1,26 @@
+"""
+In-page mutation tracking shared by the text index and the element cache.
+
+INSTALL_OBSERVER is prepended to their scripts. On first use in a page it
+creates window.__autoheal = {id, version, changed} and a MutationObserver
+that bumps `version` on every batch of mutations and records, in the
+`changed` WeakMap, the version at which each mutated node and its
+ancestors last changed. A new page (navigation) gets a new id.
+"""
+
+INSTALL_OBSERVER = """
+var state = window.__autoheal;
+if (!state) {
+  state = window.__autoheal = {
+    id: Math.random().toString(36).slice(2), version: 0, changed: new WeakMap()
+  };
+  new MutationObserver(function (records) {
+    var version = ++state.version;
+    for (var i = 0; i < records.length; i++) {
+      for (var n = records[i].target; n && state.changed.get(n) !== version; n = n.parentNode) {
+        state.changed.set(n, version);
+      }
+    }
+  }).observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+}
+"""
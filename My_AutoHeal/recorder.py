@@ -0,0 +1,124 @@
+"""
+Session recorder for offline healing strategy evaluation (see replay.py).
+
+SessionRecorder wraps AutoHealingDriver.find. At every lookup it stores the
+requested locator, the stored LocatorInfo and a compact DOM snapshot
+(scripts, styles, comments and inter-tag whitespace removed, gzipped,
+deduplicated by content hash), plus what the live run resolved.
+
+    recorder = SessionRecorder("recordings").attach(ah)
+    ...
+    recorder.close()
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict
+from typing import Dict, Optional, Any
+
+LOOKUPS_FILE = "lookups.jsonl"
+SNAPSHOT_DIR = "snapshots"
+
+# Attributes that identify the element a lookup resolved to (see _on_success)
+FINGERPRINT_KEYS = ("id", "name", "class", "type", "tag", "text")
+
+_STRIP = re.compile(r"<script\b[^>]*>.*?</script>|<style\b[^>]*>.*?</style>|<!--.*?-->", re.S | re.I)
+_BETWEEN_TAGS = re.compile(r">\s+<")
+
+
+def compact_html(page_source: str) -> str:
+    return _BETWEEN_TAGS.sub("><", _STRIP.sub("", page_source)).strip()
+
+
+def fingerprint(attributes: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    if not attributes:
+        return None
+    return {k: attributes[k] for k in FINGERPRINT_KEYS if attributes.get(k)}
+
+
+class SessionRecorder:
+    """
+    Records every find() of an AutoHealingDriver (or subclass) to
+    <out_dir>/lookups.jsonl with DOM snapshots in <out_dir>/snapshots/.
+    """
+
+    def __init__(self, out_dir: str, session: Optional[str] = None):
+        self.out_dir = out_dir
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+        self.snapshot_dir = os.path.join(out_dir, SNAPSHOT_DIR)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        self._known = set(f.split(".")[0] for f in os.listdir(self.snapshot_dir))
+        self._lookups = open(os.path.join(out_dir, LOOKUPS_FILE), "a", encoding="utf-8")
+        self._seq = 0
+        self._ah = None
+
+    def attach(self, ah) -> "SessionRecorder":
+        self._ah = ah
+        ah.find = self._wrap_find(ah.find)
+        return self
+
+    def close(self) -> None:
+        if self._ah is not None:
+            self._ah.__dict__.pop("find", None)
+            self._ah = None
+        self._lookups.close()
+
+    def snapshot(self, page_source: str) -> str:
+        compact = compact_html(page_source)
+        digest = hashlib.sha1(compact.encode("utf-8")).hexdigest()
+        if digest not in self._known:
+            with gzip.open(os.path.join(self.snapshot_dir, f"{digest}.html.gz"), "wt", encoding="utf-8") as f:
+                f.write(compact)
+            self._known.add(digest)
+        return digest
+
+    def _wrap_find(self, find):
+        def recording_find(name: str, by: str, value: str, timeout: Optional[int] = None):
+            ah = self._ah
+            stored = ah.store.get(name)
+            entry: Dict[str, Any] = {
+                "session": self.session,
+                "seq": self._seq,
+                "url": getattr(ah.driver, "current_url", None),
+                "name": name,
+                "by": by,
+                "value": value,
+                "stored": asdict(stored) if stored else None,
+            }
+            self._seq += 1
+            try:
+                entry["snapshot"] = self.snapshot(ah.driver.page_source)
+            except Exception as e:
+                logging.warning(f"[{name}] Recorder could not snapshot DOM: {e}")
+                entry["snapshot"] = None
+
+            start = time.perf_counter()
+            try:
+                element = find(name, by, value, timeout)
+            except Exception:
+                entry.update(found=False, duration=time.perf_counter() - start)
+                self._write(entry)
+                raise
+            # _on_success has just captured the resolved element's attributes
+            resolved = ah.store.get(name)
+            entry.update(
+                found=True,
+                duration=time.perf_counter() - start,
+                resolved_by=resolved.by,
+                resolved_value=resolved.value,
+                healed=resolved.healed,
+                heal_reason=resolved.heal_reason,
+                element=fingerprint(resolved.attributes),
+            )
+            self._write(entry)
+            return element
+        return recording_find
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._lookups.write(json.dumps(entry) + "\n")
+        self._lookups.flush()
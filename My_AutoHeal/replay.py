@@ -0,0 +1,149 @@
+"""
+Offline replay of recorded sessions (see recorder.py).
+
+Any healer in corpus.HEALERS re-runs the recorded lookups on StaticDriver,
+in parallel, and is scored against the element the live run resolved:
+
+    python replay.py recordings --strategies rules levenshtein --workers 4
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any
+
+from driver import LocatorInfo
+from dom import StaticDriver
+from corpus import HEALERS, percentile
+from recorder import LOOKUPS_FILE, SNAPSHOT_DIR, fingerprint
+
+
+def read_lookups(record_dir: str) -> Iterator[Dict[str, Any]]:
+    with open(os.path.join(record_dir, LOOKUPS_FILE), "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _load_snapshot(record_dir: str, digest: str) -> str:
+    with gzip.open(os.path.join(record_dir, SNAPSHOT_DIR, f"{digest}.html.gz"), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def _replay_chunk(record_dir: str, strategies: List[str], lookups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    logging.basicConfig(handlers=[logging.NullHandler()], level=logging.INFO, force=True)
+    scratch = os.path.join(tempfile.gettempdir(), f"autoheal-replay-{os.getpid()}.json")
+    driver = StaticDriver()
+    loaded = None
+    rows = []
+    for lookup in lookups:
+        if lookup.get("snapshot") is None:
+            continue
+        if lookup["snapshot"] != loaded:
+            driver.load(_load_snapshot(record_dir, lookup["snapshot"]), url=lookup.get("url") or "about:blank")
+            loaded = lookup["snapshot"]
+        for strategy in strategies:
+            ah = HEALERS[strategy](driver, locator_store_path=scratch, metrics_path=scratch, default_timeout=1e-6)
+            ah.store.save = lambda: None  # replay never writes the store
+            ah.store.clear()
+            if lookup.get("stored"):
+                ah.store.set(lookup["name"], LocatorInfo(**lookup["stored"]))
+            scanned_before = driver.elements_returned
+            start = time.perf_counter()
+            try:
+                ah.find(lookup["name"], lookup["by"], lookup["value"])
+                element = fingerprint(ah.store.get(lookup["name"]).attributes)
+            except Exception:
+                element = None
+            rows.append({
+                "strategy": strategy,
+                "labeled": bool(lookup.get("found")),
+                "found": element is not None,
+                "correct": bool(lookup.get("found")) and element == lookup.get("element"),
+                "healed": ah.metrics.heals_attempted > 0,
+                "latency": time.perf_counter() - start,
+                "scanned": driver.elements_returned - scanned_before,
+            })
+    return rows
+
+
+def replay(record_dir: str, strategies: List[str], workers: int = os.cpu_count() or 1,
+           chunk_size: int = 200) -> Dict[str, Dict[str, Any]]:
+    # Sort by snapshot so each worker parses a DOM once per run of lookups
+    lookups = sorted(read_lookups(record_dir), key=lambda l: (l.get("snapshot") or "", l["session"], l["seq"]))
+    chunks = [lookups[i:i + chunk_size] for i in range(0, len(lookups), chunk_size)]
+    rows: List[Dict[str, Any]] = []
+    if workers <= 1:
+        for chunk in chunks:
+            rows.extend(_replay_chunk(record_dir, strategies, chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_replay_chunk, record_dir, strategies, c) for c in chunks]
+            for future in futures:
+                rows.extend(future.result())
+    return summarize(rows, strategies)
+
+
+def summarize(rows: List[Dict[str, Any]], strategies: List[str]) -> Dict[str, Dict[str, Any]]:
+    report = {}
+    for strategy in strategies:
+        mine = [r for r in rows if r["strategy"] == strategy]
+        labeled = [r for r in mine if r["labeled"]]
+        healed = [r for r in mine if r["healed"]]
+        latencies = sorted(r["latency"] for r in mine)
+        report[strategy] = {
+            "lookups": len(mine),
+            "labeled": len(labeled),
+            "correct": sum(r["correct"] for r in labeled),
+            "accuracy": sum(r["correct"] for r in labeled) / len(labeled) if labeled else 0.0,
+            "found_unlabeled": sum(r["found"] for r in mine if not r["labeled"]),
+            "heals": len(healed),
+            "heal_accuracy": sum(r["correct"] for r in healed if r["labeled"]) / max(1, sum(r["labeled"] for r in healed)),
+            "latency_mean": statistics.fmean(latencies) if latencies else 0.0,
+            "latency_p50": statistics.median(latencies) if latencies else 0.0,
+            "latency_p95": percentile(latencies, 95),
+            "scanned_mean": statistics.fmean(r["scanned"] for r in mine) if mine else 0.0,
+            "scanned_total": sum(r["scanned"] for r in mine),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Dict[str, Any]]) -> None:
+    print("\n" + "=" * 50)
+    print("        OFFLINE REPLAY: HEALING STRATEGIES        ")
+    print("=" * 50)
+    for strategy, r in report.items():
+        print(f"\n[ {strategy.upper()} ]")
+        print(f"  Lookups Replayed:      {r['lookups']} ({r['labeled']} with a recorded element)")
+        print(f"  Accuracy:              {r['accuracy'] * 100:.1f}%")
+        print(f"  Heals / Heal Accuracy: {r['heals']} / {r['heal_accuracy'] * 100:.1f}%")
+        print(f"  Found (no recording):  {r['found_unlabeled']}")
+        print(f"  Latency mean/p50/p95:  {r['latency_mean'] * 1000:.3f} / {r['latency_p50'] * 1000:.3f} / {r['latency_p95'] * 1000:.3f} ms")
+        print(f"  Candidates Scanned:    {r['scanned_mean']:.1f} avg, {r['scanned_total']} total")
+    print("\n" + "=" * 50 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded lookups against healing strategies")
+    parser.add_argument("record_dir")
+    parser.add_argument("--strategies", nargs="+", choices=list(HEALERS), default=list(HEALERS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--json", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = replay(args.record_dir, args.strategies, args.workers, args.chunk_size)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
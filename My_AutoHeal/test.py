@@ -4,6 +4,9 @@ import logging
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from driver import AutoHealingDriver, LocatorInfo
+from tracer import CommandTracer
+from recorder import SessionRecorder
+from events import EventLogger
 
 def seed_memory(ah):
     currentTime = time.time()
@@ -99,10 +102,20 @@ def run_contact_scenario(ah):
 
 def main():
     driver = webdriver.Chrome()
-    ah = AutoHealingDriver(driver, metrics_path="metrics_rules.json", log_path="logs/auto_heal.log")
+    # Opt-in: AUTOHEAL_EVENTS=logs/events.jsonl writes typed JSONL events from a background thread
+    events_path = os.environ.get("AUTOHEAL_EVENTS")
+    events = EventLogger(events_path) if events_path else None
+    ah = AutoHealingDriver(driver, metrics_path="metrics_rules.json", log_path="logs/auto_heal.log", events=events)
+
+    # Opt-in: AUTOHEAL_TRACE=logs/trace records every WebDriver command per find
+    trace_prefix = os.environ.get("AUTOHEAL_TRACE")
+    tracer = CommandTracer().attach(ah) if trace_prefix else None
+    # Opt-in: AUTOHEAL_RECORD=recordings captures lookups + DOM snapshots for replay.py
+    record_dir = os.environ.get("AUTOHEAL_RECORD")
+    recorder = SessionRecorder(record_dir).attach(ah) if record_dir else None
     
     # Clear store for clean run
-    ah.store._data = {}
+    ah.store.clear()
     
     seed_memory(ah)
     
@@ -117,6 +130,11 @@ def main():
         print(f"Test failed: {e}")
     finally:
         ah.quit()
+        if tracer:
+            tracer.print_summary()
+            tracer.write(trace_prefix)
+        if recorder:
+            recorder.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,142 @@
+"""
+Page-level text index for text-based healing.
+
+One script round trip walks the page's text nodes with a TreeWalker and
+returns every visible element with its own (direct) text, normalized. The
+index is keyed by the DOM version kept in the page by page_observer.py, so
+it is rebuilt only after navigation or a mutation; until then every text
+lookup on the page is a dictionary lookup shared by all finds.
+
+    index = TextIndex(driver)
+    mode, elements = index.lookup("Log out", tag="a")
+
+Drivers that can't run JavaScript (dom.StaticDriver) fall back to indexing
+find_elements('*') once per page source, with each element's own text
+(StaticElement.own_text), so both paths pick the same element.
+"""
+
+import difflib
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple, Any
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from page_observer import INSTALL_OBSERVER
+
+_WS = re.compile(r"\s+")
+
+# Returns null when the page still has DOM version `arguments[0]`,
+# otherwise [version, [[element, tag, rawText, normalizedText], ...]].
+BUILD_SCRIPT = INSTALL_OBSERVER + """
+var key = arguments[0];
+var current = state.id + ':' + state.version;
+if (current === key) return null;
+var root = document.body || document.documentElement;
+var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+var own = new Map();
+for (var node = walker.nextNode(); node; node = walker.nextNode()) {
+  var el = node.parentElement;
+  if (!el || /^(SCRIPT|STYLE|NOSCRIPT|TEMPLATE)$/.test(el.tagName)) continue;
+  own.set(el, (own.get(el) || '') + node.data);
+}
+var rows = [];
+own.forEach(function (raw, el) {
+  var text = raw.replace(/\\s+/g, ' ').trim();
+  if (text && el.getClientRects().length) rows.push([el, el.tagName.toLowerCase(), raw, text]);
+});
+return [current, rows];
+"""
+
+# Stored texts are cut at this length (AutoHealingDriver._on_success)
+TRUNCATED_AT = 50
+
+
+def normalize_text(text: str) -> str:
+    return _WS.sub(" ", text).strip()
+
+
+class TextIndex:
+    def __init__(self, driver, fuzzy_threshold: float = 0.8):
+        self.driver = driver
+        self.fuzzy_threshold = fuzzy_threshold
+        self.version: Optional[str] = None
+        self.builds = 0
+        self._rows: List[Tuple[Any, str, str, str]] = []
+        self._by_text: Dict[str, List[int]] = {}
+        self._by_folded: Dict[str, List[int]] = {}
+
+    def refresh(self) -> None:
+        """One round trip; rebuilds the index only when the DOM version changed."""
+        try:
+            result = self.driver.execute_script(BUILD_SCRIPT, self.version)
+        except WebDriverException:
+            result = self._build_without_script()
+        if result is None:
+            return
+        self.version, rows = result
+        self._rows = [tuple(r) for r in rows]
+        self._by_text = {}
+        self._by_folded = {}
+        for i, (_, _, _, text) in enumerate(self._rows):
+            self._by_text.setdefault(text, []).append(i)
+            self._by_folded.setdefault(text.casefold(), []).append(i)
+        self.builds += 1
+
+    def lookup(self, text: str, tag: Optional[str] = None) -> Tuple[Optional[str], List[Any]]:
+        """
+        Elements whose own text matches, trying exact, normalized,
+        case-insensitive, truncated-prefix and then fuzzy matching. Returns
+        the mode that matched and the elements in document order (fuzzy:
+        best first).
+        """
+        self.refresh()
+        wanted = normalize_text(text)
+        tag = tag.lower() if tag else None
+
+        exact = [i for i in self._by_text.get(wanted, []) if self._rows[i][2] == text]
+        for mode, hits in (
+            ("exact", exact),
+            ("normalized", self._by_text.get(wanted, [])),
+            ("casefold", self._by_folded.get(wanted.casefold(), [])),
+        ):
+            elements = [self._rows[i][0] for i in hits if tag is None or self._rows[i][1] == tag]
+            if elements:
+                return mode, elements
+
+        candidates = [r for r in self._rows if tag is None or r[1] == tag]
+        if len(wanted) >= TRUNCATED_AT:
+            elements = [r[0] for r in candidates if r[3].startswith(wanted)]
+            if elements:
+                return "prefix", elements
+
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(wanted.casefold())
+        scored = []
+        for row in candidates:
+            matcher.set_seq1(row[3].casefold())
+            if matcher.real_quick_ratio() < self.fuzzy_threshold or matcher.quick_ratio() < self.fuzzy_threshold:
+                continue
+            score = matcher.ratio()
+            if score >= self.fuzzy_threshold:
+                scored.append((score, row[0]))
+        if not scored:
+            return None, []
+        scored.sort(key=lambda s: s[0], reverse=True)
+        if len(scored) > 1 and scored[1][0] == scored[0][0]:
+            return None, []  # ambiguous
+        return "fuzzy", [el for _, el in scored]
+
+    def _build_without_script(self) -> Optional[List[Any]]:
+        version = hashlib.sha1(self.driver.page_source.encode("utf-8")).hexdigest()
+        if version == self.version:
+            return None
+        rows = []
+        for el in self.driver.find_elements(By.CSS_SELECTOR, "*"):
+            # Plain WebElements only expose descendant text
+            raw = el.own_text if hasattr(el, "own_text") else el.text
+            text = normalize_text(raw or "")
+            if text:
+                rows.append((el, el.tag_name.lower(), raw, text))
+        return [version, rows]
@@ -0,0 +1,254 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple, Any
+
+
+@dataclass
+class CommandRecord:
+    command: str
+    duration: float
+    request_bytes: int
+    response_bytes: int
+    stack: Tuple[str, ...]
+    find_id: Optional[int] = None
+
+
+@dataclass
+class FindTrace:
+    find_id: int
+    name: str
+    scenario: str
+    duration: float = 0.0
+    healed: bool = False
+    commands: List[CommandRecord] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        by_command: Dict[str, int] = defaultdict(int)
+        heal_commands = 0
+        for rec in self.commands:
+            by_command[rec.command] += 1
+            if any(frame.startswith("heal:") for frame in rec.stack):
+                heal_commands += 1
+        return {
+            "find_id": self.find_id,
+            "name": self.name,
+            "scenario": self.scenario,
+            "duration": round(self.duration, 6),
+            "healed": self.healed,
+            "round_trips": len(self.commands),
+            "heal_round_trips": heal_commands,
+            "command_time": round(sum(r.duration for r in self.commands), 6),
+            "request_bytes": sum(r.request_bytes for r in self.commands),
+            "response_bytes": sum(r.response_bytes for r in self.commands),
+            "by_command": dict(by_command),
+        }
+
+
+def _payload_size(payload: Any) -> int:
+    if payload is None:
+        return 0
+    try:
+        return len(json.dumps(payload, default=str))
+    except Exception:
+        return 0
+
+
+def _empty_scenario() -> Dict[str, Any]:
+    return {
+        "finds": 0,
+        "heals": 0,
+        "round_trips": 0,
+        "round_trips_outside_find": 0,
+        "command_time": 0.0,
+        "request_bytes": 0,
+        "response_bytes": 0,
+    }
+
+
+class CommandTracer:
+    """
+    Opt-in tracer around a driver's command executor.
+
+    Every WebDriver command sent while attached is recorded with its name,
+    duration and payload sizes, and attributed to the enclosing
+    AutoHealingDriver.find / _heal_locator call. The scenario defaults to the
+    page last passed to get(), or can be set explicitly with scenario().
+
+        tracer = CommandTracer().attach(ah)
+        ...
+        tracer.write("logs/trace")   # -> logs/trace.json, logs/trace.folded
+    """
+
+    def __init__(self):
+        self.records: List[CommandRecord] = []
+        self.finds: List[FindTrace] = []
+        self._stack: List[str] = []
+        self._active: List[FindTrace] = []
+        self._scenario = "(setup)"
+        self._explicit_scenario = False
+        self._patched: List[Tuple[Any, str, Any]] = []
+
+    # --- attaching ---
+
+    def attach(self, ah) -> "CommandTracer":
+        executor = ah.driver.command_executor
+        self._patch(executor, "execute", self._wrap_execute(executor.execute))
+        self._patch(ah, "get", self._wrap_get(ah.get))
+        self._patch(ah, "find", self._wrap_find(ah.find))
+        self._patch(ah, "_heal_locator", self._wrap_heal(ah._heal_locator))
+        return self
+
+    def detach(self) -> None:
+        for obj, attr, original in reversed(self._patched):
+            if original is None:
+                obj.__dict__.pop(attr, None)
+            else:
+                setattr(obj, attr, original)
+        self._patched = []
+
+    def _patch(self, obj, attr: str, wrapper) -> None:
+        # Remember whether the attribute was set on the instance itself so
+        # detach() restores the class method instead of pinning a bound copy.
+        self._patched.append((obj, attr, obj.__dict__.get(attr)))
+        setattr(obj, attr, wrapper)
+
+    def _wrap_execute(self, execute):
+        def traced_execute(command, params=None):
+            request_bytes = _payload_size(params)
+            start = time.perf_counter()
+            response = None
+            try:
+                response = execute(command, params)
+                return response
+            finally:
+                self._record(command, time.perf_counter() - start, request_bytes, _payload_size(response))
+        return traced_execute
+
+    def _wrap_get(self, get):
+        def traced_get(url: str, *args, **kwargs):
+            if not self._explicit_scenario:
+                self._scenario = os.path.basename(url.rstrip("/")) or url
+            with self.span(f"get:{self._scenario}"):
+                return get(url, *args, **kwargs)
+        return traced_get
+
+    def _wrap_find(self, find):
+        def traced_find(name: str, *args, **kwargs):
+            trace = FindTrace(find_id=len(self.finds), name=name, scenario=self._scenario)
+            self.finds.append(trace)
+            self._active.append(trace)
+            start = time.perf_counter()
+            try:
+                with self.span(f"find:{name}"):
+                    return find(name, *args, **kwargs)
+            finally:
+                trace.duration = time.perf_counter() - start
+                self._active.pop()
+        return traced_find
+
+    def _wrap_heal(self, heal):
+        def traced_heal(name: str, *args, **kwargs):
+            if self._active:
+                self._active[-1].healed = True
+            with self.span(f"heal:{name}"):
+                return heal(name, *args, **kwargs)
+        return traced_heal
+
+    # --- frames ---
+
+    @contextmanager
+    def span(self, label: str):
+        self._stack.append(label)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+
+    @contextmanager
+    def scenario(self, name: str):
+        previous, previous_explicit = self._scenario, self._explicit_scenario
+        self._scenario, self._explicit_scenario = name, True
+        try:
+            yield
+        finally:
+            self._scenario, self._explicit_scenario = previous, previous_explicit
+
+    def _record(self, command: str, duration: float, request_bytes: int, response_bytes: int) -> None:
+        find = self._active[-1] if self._active else None
+        rec = CommandRecord(
+            command=command,
+            duration=duration,
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            stack=(self._scenario, *self._stack),
+            find_id=find.find_id if find else None,
+        )
+        self.records.append(rec)
+        if find:
+            find.commands.append(rec)
+
+    # --- output ---
+
+    def find_summary(self) -> List[Dict[str, Any]]:
+        return [f.summary() for f in self.finds]
+
+    def scenario_summary(self) -> Dict[str, Dict[str, Any]]:
+        scenarios: Dict[str, Dict[str, Any]] = {}
+        for rec in self.records:
+            s = scenarios.setdefault(rec.stack[0], _empty_scenario())
+            s["round_trips"] += 1
+            if rec.find_id is None:
+                s["round_trips_outside_find"] += 1
+            s["command_time"] += rec.duration
+            s["request_bytes"] += rec.request_bytes
+            s["response_bytes"] += rec.response_bytes
+        for f in self.finds:
+            s = scenarios.setdefault(f.scenario, _empty_scenario())
+            s["finds"] += 1
+            s["heals"] += int(f.healed)
+        for s in scenarios.values():
+            s["command_time"] = round(s["command_time"], 6)
+            s["round_trips_per_find"] = round(
+                (s["round_trips"] - s["round_trips_outside_find"]) / s["finds"], 2
+            ) if s["finds"] else 0.0
+        return scenarios
+
+    def folded(self) -> List[str]:
+        """
+        Collapsed stacks in the format read by flamegraph.pl / speedscope:
+        'frame;frame;command <microseconds>'.
+        """
+        totals: Dict[str, int] = defaultdict(int)
+        for rec in self.records:
+            key = ";".join((*rec.stack, rec.command))
+            totals[key] += max(1, int(rec.duration * 1_000_000))
+        return [f"{k} {v}" for k, v in totals.items()]
+
+    def write(self, prefix: str) -> None:
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        report = {
+            "scenarios": self.scenario_summary(),
+            "finds": self.find_summary(),
+            "commands": [asdict(r) for r in self.records],
+        }
+        with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        with open(f"{prefix}.folded", "w", encoding="utf-8") as f:
+            f.write("\n".join(self.folded()) + "\n")
+
+    def print_summary(self) -> None:
+        print("\n--- WebDriver round trips per find ---")
+        for s in self.find_summary():
+            heal = f" (heal: {s['heal_round_trips']})" if s["healed"] else ""
+            print(f"  [{s['scenario']}] {s['name']}: {s['round_trips']} commands{heal}, "
+                  f"{s['duration']:.3f}s, {s['request_bytes'] + s['response_bytes']} bytes")
+        print("\n--- WebDriver round trips per scenario ---")
+        for name, s in self.scenario_summary().items():
+            print(f"  {name}: {s['round_trips']} commands over {s['finds']} finds "
+                  f"({s['round_trips_per_find']}/find, {s['heals']} heals), {s['command_time']:.3f}s")